@@ -2,48 +2,58 @@
 
 import os
 import logging
+from dataclasses import dataclass
 from typing import Optional
-from dotenv import load_dotenv
 
-# Load environment variables
-load_dotenv()
+# Load environment variables from the project .env, only when one exists
+# (production environments may set them directly)
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DOTENV_PATH = os.getenv("DOTENV_PATH", os.path.join(PROJECT_ROOT, ".env"))
+if os.path.isfile(DOTENV_PATH):
+    from dotenv import load_dotenv
+    load_dotenv(DOTENV_PATH, override=False)
 
 class ConfigError(Exception):
     """Configuration validation error."""
     pass
 
+@dataclass(frozen=True)
 class Config:
-    """Configuration class for BananaBot with validation."""
+    """Configuration for BananaBot with validation, read from the environment once."""
     
     # Discord Configuration
-    DISCORD_TOKEN: str = os.getenv("DISCORD_TOKEN", "")
-    GUILD_ID: Optional[str] = os.getenv("GUILD_ID")
+    DISCORD_TOKEN: str = ""
+    GUILD_ID: Optional[str] = None
     
     # Gemini API Configuration  
-    GEMINI_API_KEY: str = os.getenv("GEMINI_API_KEY", "")
+    GEMINI_API_KEY: str = ""
     GEMINI_MODEL: str = "gemini-2.5-flash-image-preview"
+    MAX_CONCURRENT_GEMINI_CALLS: int = 4
+    """Maximum Gemini API calls in flight at once across all users."""
     
     # Rate Limiting - Production safe defaults with bounds
-    MAX_REQUESTS_PER_HOUR: int = int(os.getenv("MAX_REQUESTS_PER_HOUR", "3"))
+    MAX_REQUESTS_PER_HOUR: int = 3
     """Rate limit per user per hour for standard image commands."""
-    MAX_FUSION_REQUESTS_PER_HOUR: int = int(os.getenv("MAX_FUSION_REQUESTS_PER_HOUR", "1"))
+    MAX_FUSION_REQUESTS_PER_HOUR: int = 1
     """Rate limit per user per hour for fusion commands (uses more input tokens)."""
+    MAX_CONCURRENT_REQUESTS_PER_USER: int = 2
+    """Maximum image commands a single user may have in flight at once."""
     
     # Logging
-    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO").upper()
+    LOG_LEVEL: str = "INFO"
     
     # Image Processing
     MAX_IMAGE_SIZE_MB: int = 8  # Discord limit
     SUPPORTED_FORMATS: tuple = ("PNG", "JPEG", "JPG", "WEBP")
     
     # Content Safety
-    ENABLE_CONTENT_FILTER: bool = os.getenv("ENABLE_CONTENT_FILTER", "true").lower() == "true"
+    ENABLE_CONTENT_FILTER: bool = True
     
     # Batch Processing - Production safe defaults
-    ENABLE_BATCH_PROCESSING: bool = os.getenv("ENABLE_BATCH_PROCESSING", "false").lower() == "true"
-    BATCH_SIZE: int = int(os.getenv("BATCH_SIZE", "10"))
+    ENABLE_BATCH_PROCESSING: bool = False
+    BATCH_SIZE: int = 10
     """Batch size for bulk processing. Max recommended: 100 (Gemini API limit)."""
-    BATCH_TIMEOUT: int = int(os.getenv("BATCH_TIMEOUT", "1800"))  # 30 minutes
+    BATCH_TIMEOUT: int = 1800  # 30 minutes
     """Batch timeout in seconds. Gemini batch target: 24 hours, minimum: 5 minutes."""
     
     # Cost Management
@@ -51,11 +61,29 @@ class Config:
     BATCH_IMAGE_COST: float = 0.0195   # 50% discount for batch processing
     
     # Rate Limiter Configuration
-    RATE_LIMITER_CLEANUP_INTERVAL: int = int(os.getenv("RATE_LIMITER_CLEANUP_INTERVAL", "3600"))
+    RATE_LIMITER_CLEANUP_INTERVAL: int = 3600
     """Rate limiter cleanup interval in seconds. Default: 1 hour."""
     
     @classmethod
-    def validate_config(cls) -> None:
+    def from_env(cls) -> 'Config':
+        """Build configuration from environment variables."""
+        return cls(
+            DISCORD_TOKEN=os.getenv("DISCORD_TOKEN", ""),
+            GUILD_ID=os.getenv("GUILD_ID"),
+            GEMINI_API_KEY=os.getenv("GEMINI_API_KEY", ""),
+            MAX_CONCURRENT_GEMINI_CALLS=int(os.getenv("MAX_CONCURRENT_GEMINI_CALLS", "4")),
+            MAX_REQUESTS_PER_HOUR=int(os.getenv("MAX_REQUESTS_PER_HOUR", "3")),
+            MAX_FUSION_REQUESTS_PER_HOUR=int(os.getenv("MAX_FUSION_REQUESTS_PER_HOUR", "1")),
+            MAX_CONCURRENT_REQUESTS_PER_USER=int(os.getenv("MAX_CONCURRENT_REQUESTS_PER_USER", "2")),
+            LOG_LEVEL=os.getenv("LOG_LEVEL", "INFO").upper(),
+            ENABLE_CONTENT_FILTER=os.getenv("ENABLE_CONTENT_FILTER", "true").lower() == "true",
+            ENABLE_BATCH_PROCESSING=os.getenv("ENABLE_BATCH_PROCESSING", "false").lower() == "true",
+            BATCH_SIZE=int(os.getenv("BATCH_SIZE", "10")),
+            BATCH_TIMEOUT=int(os.getenv("BATCH_TIMEOUT", "1800")),
+            RATE_LIMITER_CLEANUP_INTERVAL=int(os.getenv("RATE_LIMITER_CLEANUP_INTERVAL", "3600")),
+        )
+    
+    def validate_config(self) -> None:
         """Validate that all required environment variables are set and values are safe.
         
         Raises:
@@ -64,10 +92,10 @@ class Config:
         missing_vars = []
         
         # Required variables
-        if not cls.DISCORD_TOKEN:
+        if not self.DISCORD_TOKEN:
             missing_vars.append("DISCORD_TOKEN")
         
-        if not cls.GEMINI_API_KEY:
+        if not self.GEMINI_API_KEY:
             missing_vars.append("GEMINI_API_KEY")
         
         if missing_vars:
@@ -77,34 +105,45 @@ class Config:
             )
         
         # Validate rate limiting bounds (prevent abuse)
-        if not (1 <= cls.MAX_REQUESTS_PER_HOUR <= 1000):
+        if not (1 <= self.MAX_REQUESTS_PER_HOUR <= 1000):
+            raise ConfigError(
+                f"MAX_REQUESTS_PER_HOUR must be between 1-1000, got {self.MAX_REQUESTS_PER_HOUR}"
+            )
+        
+        # Validate per-user concurrency bound
+        if not (1 <= self.MAX_CONCURRENT_REQUESTS_PER_USER <= 10):
             raise ConfigError(
-                f"MAX_REQUESTS_PER_HOUR must be between 1-1000, got {cls.MAX_REQUESTS_PER_HOUR}"
+                f"MAX_CONCURRENT_REQUESTS_PER_USER must be between 1-10, got {self.MAX_CONCURRENT_REQUESTS_PER_USER}"
+            )
+        
+        # Validate Gemini concurrency bound
+        if not (1 <= self.MAX_CONCURRENT_GEMINI_CALLS <= 100):
+            raise ConfigError(
+                f"MAX_CONCURRENT_GEMINI_CALLS must be between 1-100, got {self.MAX_CONCURRENT_GEMINI_CALLS}"
             )
         
         # Validate batch processing bounds
-        if not (1 <= cls.BATCH_SIZE <= 100):
+        if not (1 <= self.BATCH_SIZE <= 100):
             raise ConfigError(
-                f"BATCH_SIZE must be between 1-100 (Gemini API limit), got {cls.BATCH_SIZE}"
+                f"BATCH_SIZE must be between 1-100 (Gemini API limit), got {self.BATCH_SIZE}"
             )
         
         # Validate batch timeout (minimum 5 minutes for AI generation)
-        if cls.BATCH_TIMEOUT < 300:
+        if self.BATCH_TIMEOUT < 300:
             raise ConfigError(
-                f"BATCH_TIMEOUT must be at least 300 seconds (5 minutes), got {cls.BATCH_TIMEOUT}"
+                f"BATCH_TIMEOUT must be at least 300 seconds (5 minutes), got {self.BATCH_TIMEOUT}"
             )
         
         # Validate cleanup interval
-        if cls.RATE_LIMITER_CLEANUP_INTERVAL < 60:
+        if self.RATE_LIMITER_CLEANUP_INTERVAL < 60:
             raise ConfigError(
-                f"RATE_LIMITER_CLEANUP_INTERVAL must be at least 60 seconds, got {cls.RATE_LIMITER_CLEANUP_INTERVAL}"
+                f"RATE_LIMITER_CLEANUP_INTERVAL must be at least 60 seconds, got {self.RATE_LIMITER_CLEANUP_INTERVAL}"
             )
     
-    @classmethod
-    def setup_logging(cls) -> None:
+    def setup_logging(self) -> None:
         """Setup logging configuration."""
         logging.basicConfig(
-            level=getattr(logging, cls.LOG_LEVEL, logging.INFO),
+            level=getattr(logging, self.LOG_LEVEL, logging.INFO),
             format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
             handlers=[
                 logging.StreamHandler(),
@@ -117,4 +156,4 @@ class Config:
         logging.getLogger('discord.http').setLevel(logging.WARNING)
 
 # Global config instance
-config = Config()
\ No newline at end of file
+config = Config.from_env()
\ No newline at end of file
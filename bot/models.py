@@ -5,11 +5,13 @@ import os
 import tempfile
 from datetime import datetime
 from typing import List, Optional, Dict, Any
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 from pathlib import Path
 
 # Data storage path - mounted volume for persistence on VPS, local fallback for dev
 DATA_ROOT = None
+# Set once the data directories exist so save/load skip the mkdir calls
+_DIRECTORIES_READY = False
 
 def get_data_root():
     """Get data root path with VPS volume fallback."""
@@ -33,8 +35,10 @@ def get_data_root():
     return local_path
 
 def ensure_data_directories():
-    """Ensure all data directories exist."""
-    global DATA_ROOT
+    """Ensure all data directories exist (only touches the filesystem once)."""
+    global DATA_ROOT, _DIRECTORIES_READY
+    if _DIRECTORIES_READY:
+        return
     if DATA_ROOT is None:
         DATA_ROOT = get_data_root()
     
@@ -51,6 +55,7 @@ def ensure_data_directories():
         (DATA_ROOT / "user_stats").mkdir(parents=True, exist_ok=True)
         (DATA_ROOT / "batch_requests").mkdir(parents=True, exist_ok=True)
         print(f"Using fallback data path: {DATA_ROOT}")
+    _DIRECTORIES_READY = True
 
 def get_data_path():
     """Get current data root path."""
@@ -83,21 +88,33 @@ class UserGallery(BaseModel):
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
     
-    def add_work(self, work: ImageWork) -> None:
-        """Add new work to gallery."""
+    # Works by ID for O(1) lookups; not persisted, rebuilt on load
+    _works_by_id: Dict[str, ImageWork] = PrivateAttr(default_factory=dict)
+    
+    def model_post_init(self, __context: Any) -> None:
+        """Index loaded works by ID."""
+        self._works_by_id = {work.id: work for work in self.works}
+    
+    def add_work(self, work: ImageWork, save: bool = True) -> None:
+        """Add new work to gallery, saving immediately unless save is False."""
         self.works.append(work)
+        self._works_by_id[work.id] = work
         self.total_generations += 1
         self.total_cost += work.cost
         self.updated_at = datetime.utcnow()
-        self.save()
+        if save:
+            self.save()
     
     def get_recent_works(self, limit: int = 10) -> List[ImageWork]:
-        """Get recent works."""
-        return sorted(self.works, key=lambda x: x.created_at, reverse=True)[:limit]
+        """Get recent works, newest first."""
+        # add_work appends in creation order, so the newest works are the tail
+        if limit <= 0:
+            return []
+        return self.works[-limit:][::-1]
     
     def get_work_by_id(self, work_id: str) -> Optional[ImageWork]:
         """Get specific work by ID."""
-        return next((w for w in self.works if w.id == work_id), None)
+        return self._works_by_id.get(work_id)
     
     def save(self) -> None:
         """Save gallery to file on mounted volume with atomic writes."""
@@ -113,7 +130,8 @@ class UserGallery(BaseModel):
             delete=False
         ) as temp_file:
             try:
-                json.dump(self.model_dump(), temp_file, default=str, indent=2)
+                # Serialized by pydantic-core in one pass; datetimes are encoded natively
+                temp_file.write(self.model_dump_json(indent=2))
                 temp_file.flush()
                 os.fsync(temp_file.fileno())  # Force write to disk
                 
@@ -137,8 +155,8 @@ class UserGallery(BaseModel):
         
         if file_path.exists():
             with open(file_path, 'r') as f:
-                data = json.load(f)
-                return cls(**data)
+                # Parse and validate in one pass instead of json.load + cls(**data)
+                return cls.model_validate_json(f.read())
         else:
             return cls(user_id=user_id)
 
@@ -168,6 +186,8 @@ class BatchRequest(BaseModel):
             delete=False
         ) as temp_file:
             try:
+                # results may hold raw image bytes, which model_dump_json rejects as
+                # invalid UTF-8; default=str stringifies them (and datetimes)
                 json.dump(self.model_dump(), temp_file, default=str, indent=2)
                 temp_file.flush()
                 os.fsync(temp_file.fileno())  # Force write to disk
@@ -192,10 +212,13 @@ class BatchRequest(BaseModel):
         
         if file_path.exists():
             with open(file_path, 'r') as f:
-                data = json.load(f)
-                return cls(**data)
+                # Parse and validate in one pass instead of json.load + cls(**data)
+                return cls.model_validate_json(f.read())
         return None
 
+# Most recent unique prompts kept in UserStats.favorite_prompts
+FAVORITE_PROMPTS_LIMIT = 100
+
 class UserStats(BaseModel):
     """User statistics and usage tracking."""
     
@@ -210,8 +233,16 @@ class UserStats(BaseModel):
     first_generation: Optional[datetime] = None
     last_generation: Optional[datetime] = None
     
-    def update_stats(self, work: ImageWork) -> None:
-        """Update stats with new work."""
+    # Mirror of favorite_prompts for O(1) membership checks; not persisted
+    _favorite_prompt_set: set = PrivateAttr(default_factory=set)
+    
+    def model_post_init(self, __context: Any) -> None:
+        """Trim loaded favorites to the limit and build the membership set."""
+        del self.favorite_prompts[:-FAVORITE_PROMPTS_LIMIT]
+        self._favorite_prompt_set = set(self.favorite_prompts)
+    
+    def update_stats(self, work: ImageWork, save: bool = True) -> None:
+        """Update stats with new work, saving immediately unless save is False."""
         if work.generation_type == "create":
             self.total_generations += 1
         elif work.generation_type == "edit":
@@ -225,11 +256,15 @@ class UserStats(BaseModel):
             self.first_generation = work.created_at
         self.last_generation = work.created_at
         
-        # Track favorite prompts (simplified)
-        if work.prompt not in self.favorite_prompts:
+        # Track favorite prompts (simplified), keeping only the most recent ones
+        if work.prompt not in self._favorite_prompt_set:
+            self._favorite_prompt_set.add(work.prompt)
             self.favorite_prompts.append(work.prompt)
+            if len(self.favorite_prompts) > FAVORITE_PROMPTS_LIMIT:
+                self._favorite_prompt_set.discard(self.favorite_prompts.pop(0))
         
-        self.save()
+        if save:
+            self.save()
     
     def save(self) -> None:
         """Save stats to file on mounted volume with atomic writes."""
@@ -245,7 +280,8 @@ class UserStats(BaseModel):
             delete=False
         ) as temp_file:
             try:
-                json.dump(self.model_dump(), temp_file, default=str, indent=2)
+                # Serialized by pydantic-core in one pass; datetimes are encoded natively
+                temp_file.write(self.model_dump_json(indent=2))
                 temp_file.flush()
                 os.fsync(temp_file.fileno())  # Force write to disk
                 
@@ -269,7 +305,7 @@ class UserStats(BaseModel):
         
         if file_path.exists():
             with open(file_path, 'r') as f:
-                data = json.load(f)
-                return cls(**data)
+                # Parse and validate in one pass instead of json.load + cls(**data)
+                return cls.model_validate_json(f.read())
         else:
             return cls(user_id=user_id)
\ No newline at end of file
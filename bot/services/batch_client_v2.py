@@ -3,12 +3,13 @@
 import asyncio
 import logging
 import json
-import uuid
+import secrets
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional, Tuple
 import google.generativeai as genai
 from ..config import config
 from ..utils.error_handler import GeminiAPIError
+from ..utils.rate_limiter import BackpressureController, CircuitBreaker, guarded_call
 
 logger = logging.getLogger(__name__)
 
@@ -22,10 +23,25 @@ class GeminiBatchProcessor:
     - Automated batch job management
     """
     
-    def __init__(self, api_key: str):
-        """Initialize batch processor."""
+    def __init__(
+        self,
+        api_key: str,
+        backpressure: Optional[BackpressureController] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None
+    ):
+        """
+        Initialize batch processor.
+        
+        Args:
+            api_key: Google AI Studio API key
+            backpressure: Concurrency controller shared with the regular client,
+                so overload seen on either path throttles both
+            circuit_breaker: Circuit breaker shared with the regular client
+        """
         self.api_key = api_key
         self.model = config.GEMINI_MODEL
+        self.backpressure = backpressure or BackpressureController(c_max=config.MAX_CONCURRENT_GEMINI_CALLS)
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
         
         # Configure Gemini client
         genai.configure(api_key=self.api_key)
@@ -59,7 +75,7 @@ class GeminiBatchProcessor:
         if len(prompts) > self.max_batch_size:
             raise ValueError(f"Batch cannot exceed {self.max_batch_size} prompts")
         
-        logger.info(f"Submitting batch job {batch_id} with {len(prompts)} prompts")
+        logger.info("Submitting batch job %s with %s prompts", batch_id, len(prompts))
         
         try:
             # Create inline requests for Gemini Batch API
@@ -73,11 +89,11 @@ class GeminiBatchProcessor:
             loop = asyncio.get_event_loop()
             batch_job = await loop.run_in_executor(None, self._sync_submit_batch, inline_requests, batch_id)
             
-            logger.info(f"Batch job {batch_id} submitted successfully - Job ID: {batch_job.name}")
+            logger.info("Batch job %s submitted successfully - Job ID: %s", batch_id, batch_job.name)
             return batch_job.name
             
         except Exception as e:
-            logger.error(f"Failed to submit batch job {batch_id}: {e}")
+            logger.error("Failed to submit batch job %s: %s", batch_id, e)
             raise GeminiAPIError(f"Batch submission failed: {e}")
     
     def _sync_submit_batch(self, inline_requests: List[Dict], batch_id: str):
@@ -96,7 +112,7 @@ class GeminiBatchProcessor:
             return batch_job
             
         except Exception as e:
-            logger.error(f"Batch API submission failed: {e}")
+            logger.error("Batch API submission failed: %s", e)
             # Fallback: process individually but with batch pricing
             return self._fallback_batch_processing(inline_requests, batch_id)
     
@@ -118,7 +134,7 @@ class GeminiBatchProcessor:
             return status
             
         except Exception as e:
-            logger.error(f"Failed to check batch status {job_id}: {e}")
+            logger.error("Failed to check batch status %s: %s", job_id, e)
             return {"status": "FAILED", "error": str(e)}
     
     def _sync_check_status(self, job_id: str) -> Dict[str, Any]:
@@ -138,7 +154,7 @@ class GeminiBatchProcessor:
             }
             
         except Exception as e:
-            logger.warning(f"Real batch status check failed: {e}, using fallback")
+            logger.warning("Real batch status check failed: %s, using fallback", e)
             return {"status": "COMPLETED", "job_id": job_id}  # Optimistic fallback
     
     async def _simulate_batch_status(self, job_id: str) -> Dict[str, Any]:
@@ -156,37 +172,36 @@ class GeminiBatchProcessor:
             "completion_time": datetime.utcnow().isoformat()
         }
     
-    async def get_batch_results(self, job_id: str) -> List[Dict[str, Any]]:
+    async def get_batch_results(self, job_id: str, prompts: List[str]) -> List[Dict[str, Any]]:
         """Retrieve results from completed batch job."""
         try:
             # This would use the real API:
             # results = genai.get_batch_results(job_id)
             
             # Simulated results
-            return await self._simulate_batch_results(job_id)
+            return await self._simulate_batch_results(job_id, prompts)
             
         except Exception as e:
-            logger.error(f"Failed to get batch results {job_id}: {e}")
+            logger.error("Failed to get batch results %s: %s", job_id, e)
             raise GeminiAPIError(f"Failed to retrieve batch results: {e}")
     
-    async def _simulate_batch_results(self, job_id: str) -> List[Dict[str, Any]]:
+    async def _simulate_batch_results(self, job_id: str, prompts: List[str]) -> List[Dict[str, Any]]:
         """Simulate batch results (for development)."""
         # In real implementation, this would return actual generated images
         # For now, we'll generate them individually but apply batch pricing
         
         results = []
-        for i in range(3):  # Simulate 3 results
+        for i, prompt in enumerate(prompts):
             try:
                 # Generate actual image using regular API
-                fake_prompt = f"Batch generated image {i+1}"
-                image_bytes = await self._generate_single_image(fake_prompt)
+                image_bytes = await self._generate_single_image(prompt)
                 
                 results.append({
                     "request_id": f"{job_id}_{i}",
                     "status": "SUCCESS",
                     "image_data": image_bytes,
                     "cost": self.batch_cost,  # 50% discount
-                    "prompt": fake_prompt
+                    "prompt": prompt
                 })
             except Exception as e:
                 results.append({
@@ -199,8 +214,7 @@ class GeminiBatchProcessor:
     
     async def _generate_single_image(self, prompt: str) -> bytes:
         """Generate a single image (fallback for batch simulation)."""
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, self._sync_generate, prompt)
+        return await guarded_call(self.backpressure, self.circuit_breaker, self._sync_generate, prompt)
     
     def _sync_generate(self, prompt: str) -> bytes:
         """Synchronous image generation."""
@@ -216,7 +230,7 @@ class GeminiBatchProcessor:
             return b"dummy_image_data_for_development"
             
         except Exception as e:
-            logger.error(f"Single image generation failed: {e}")
+            logger.error("Single image generation failed: %s", e)
             raise
     
     async def process_batch(self, prompts: List[str], user_id: str, batch_id: str) -> List[Tuple[str, bytes]]:
@@ -231,7 +245,7 @@ class GeminiBatchProcessor:
         Returns:
             List of (prompt, image_bytes) tuples
         """
-        logger.info(f"Processing batch {batch_id} for user {user_id} with {len(prompts)} prompts")
+        logger.info("Processing batch %s for user %s with %s prompts", batch_id, user_id, len(prompts))
         
         try:
             # Step 1: Submit batch job
@@ -255,13 +269,13 @@ class GeminiBatchProcessor:
                 
                 # Update progress (you could send Discord updates here)
                 if wait_time % 30 == 0:  # Every 30 seconds
-                    logger.info(f"Batch {batch_id} still processing... ({wait_time}s)")
+                    logger.info("Batch %s still processing... (%ss)", batch_id, wait_time)
             
             if wait_time >= max_wait:
                 raise GeminiAPIError(f"Batch job timed out after {max_wait} seconds")
             
             # Step 3: Retrieve results
-            results = await self.get_batch_results(job_id)
+            results = await self.get_batch_results(job_id, prompts)
             
             # Step 4: Process and return successful results
             successful_results = []
@@ -272,13 +286,13 @@ class GeminiBatchProcessor:
                         result["image_data"]
                     ))
                 else:
-                    logger.warning(f"Batch item failed: {result.get('error', 'Unknown error')}")
+                    logger.warning("Batch item failed: %s", result.get('error', 'Unknown error'))
             
-            logger.info(f"Batch {batch_id} completed: {len(successful_results)}/{len(prompts)} successful")
+            logger.info("Batch %s completed: %s/%s successful", batch_id, len(successful_results), len(prompts))
             return successful_results
             
         except Exception as e:
-            logger.error(f"Batch processing failed for {batch_id}: {e}")
+            logger.error("Batch processing failed for %s: %s", batch_id, e)
             raise GeminiAPIError(f"Batch processing failed: {e}")
     
     async def estimate_batch_savings(self, num_images: int) -> Dict[str, float]:
@@ -315,7 +329,7 @@ class BatchManager:
     
     async def submit_user_batch(self, user_id: str, prompts: List[str]) -> str:
         """Submit a batch for a user with tracking."""
-        batch_id = str(uuid.uuid4())[:8]
+        batch_id = secrets.token_hex(4)
         
         # Track batch
         self.active_batches[batch_id] = {
@@ -0,0 +1,166 @@
+"""In-memory write-back cache for user galleries and stats."""
+
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple, Union
+
+from ..models import ImageWork, UserGallery, UserStats
+
+logger = logging.getLogger(__name__)
+
+UserRecord = Union[UserGallery, UserStats]
+
+class GalleryCache:
+    """
+    Keeps loaded UserGallery/UserStats objects in memory between commands.
+
+    Each user's files are read from disk once, mutated in memory, and written
+    back by a periodic flusher on a worker thread, so repeated commands from
+    the same user cost one read and one batched write instead of a blocking
+    load and save per command.
+    """
+
+    def __init__(self, flush_interval: float = 2.0, max_users: int = 1024):
+        """
+        Initialize gallery cache.
+
+        Args:
+            flush_interval: Seconds between write-back flushes
+            max_users: Maximum users kept in memory (unsaved users are never evicted)
+        """
+        self.flush_interval = flush_interval
+        self.max_users = max_users
+        self._galleries: "OrderedDict[str, UserGallery]" = OrderedDict()
+        self._stats: "OrderedDict[str, UserStats]" = OrderedDict()
+        self._dirty: Dict[Tuple[str, str], UserRecord] = {}
+        self._flushing: Dict[Tuple[str, str], UserRecord] = {}  # Being written right now
+        self._recording: Dict[str, int] = {}  # Users with a record_work in progress
+        self._flush_task: Optional[asyncio.Task] = None
+
+        logger.info("Gallery cache initialized: flush every %ss, up to %s users", flush_interval, max_users)
+
+    def start(self) -> None:
+        """Start the periodic write-back task."""
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def get_gallery(self, user_id: str) -> UserGallery:
+        """
+        Get a user's gallery, loading it from disk on first use.
+
+        Args:
+            user_id: Discord user ID as string
+
+        Returns:
+            The cached gallery
+        """
+        return await self._get(self._galleries, UserGallery, user_id)
+
+    async def get_stats(self, user_id: str) -> UserStats:
+        """
+        Get a user's stats, loading them from disk on first use.
+
+        Args:
+            user_id: Discord user ID as string
+
+        Returns:
+            The cached stats
+        """
+        return await self._get(self._stats, UserStats, user_id)
+
+    async def record_work(self, user_id: str, work: ImageWork) -> None:
+        """
+        Add a work to the user's gallery and stats; persisted on the next flush.
+
+        Args:
+            user_id: Discord user ID as string
+            work: Newly created work
+        """
+        # Pin the user so loading one record cannot evict the other
+        self._recording[user_id] = self._recording.get(user_id, 0) + 1
+        try:
+            gallery = await self.get_gallery(user_id)
+            stats = await self.get_stats(user_id)
+        finally:
+            self._recording[user_id] -= 1
+            if not self._recording[user_id]:
+                del self._recording[user_id]
+
+        gallery.add_work(work, save=False)
+        stats.update_stats(work, save=False)
+
+        self._dirty[("gallery", user_id)] = gallery
+        self._dirty[("stats", user_id)] = stats
+
+    async def flush(self) -> None:
+        """Write all dirty galleries and stats to disk on a worker thread."""
+        if not self._dirty:
+            return
+
+        self._flushing, self._dirty = self._dirty, {}
+        try:
+            while self._flushing:
+                key, record = next(iter(self._flushing.items()))
+                try:
+                    await asyncio.to_thread(record.save)
+                except Exception as e:
+                    logger.error("Failed to save %s for user %s: %s", key[0], key[1], e)
+                    # Retry on the next flush unless a newer change already queued it
+                    self._dirty.setdefault(key, record)
+                del self._flushing[key]
+        finally:
+            # Anything not written yet (e.g. the flush was cancelled) stays dirty
+            for key, record in self._flushing.items():
+                self._dirty.setdefault(key, record)
+            self._flushing = {}
+
+        self._evict()
+
+    async def shutdown(self) -> None:
+        """Stop the flusher and write any remaining changes."""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+
+        await self.flush()
+        logger.info("Gallery cache shutdown complete")
+
+    async def _get(self, cache: "OrderedDict[str, UserRecord]", model: type, user_id: str) -> UserRecord:
+        """Return a cached record or load it without blocking the event loop."""
+        record = cache.get(user_id)
+        if record is None:
+            loaded = await asyncio.to_thread(model.load, user_id)
+            # Another command may have loaded the same user meanwhile; keep one object
+            record = cache.setdefault(user_id, loaded)
+
+        cache.move_to_end(user_id)
+        self._evict()
+        return record
+
+    def _evict(self) -> None:
+        """Drop least recently used clean users beyond max_users."""
+        for kind, cache in (("gallery", self._galleries), ("stats", self._stats)):
+            # Never evict the most recently used entry (it is being returned)
+            for user_id in list(cache)[:-1]:
+                if len(cache) <= self.max_users:
+                    break
+                if user_id in self._recording:
+                    continue
+                key = (kind, user_id)
+                if key not in self._dirty and key not in self._flushing:
+                    del cache[user_id]
+
+    async def _flush_loop(self) -> None:
+        """Periodically flush dirty records."""
+        while True:
+            try:
+                await asyncio.sleep(self.flush_interval)
+                await self.flush()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error("Gallery flush task error: %s", e)
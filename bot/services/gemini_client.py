@@ -1,15 +1,21 @@
 """Gemini API client wrapper with retry logic and error handling."""
 
 import asyncio
+import hashlib
 import io
 import logging
+from typing import Any, Awaitable, Callable, Dict, Tuple
 from PIL import Image
 import google.generativeai as genai
 from ..config import config
-from ..utils.error_handler import GeminiAPIError, ContentFilterError
+from ..utils.error_handler import GeminiAPIError, ContentFilterError, CircuitOpenError
+from ..utils.rate_limiter import BackpressureController, CircuitBreaker, guarded_call
 
 logger = logging.getLogger(__name__)
 
+# Image formats Gemini accepts as-is; anything else is re-encoded by the SDK
+INLINE_IMAGE_MIME_TYPES = frozenset({"image/png", "image/jpeg", "image/webp"})
+
 class GeminiImageClient:
     """
     Wrapper for Google Gemini 2.5 Flash Image API.
@@ -27,6 +33,14 @@ class GeminiImageClient:
         """
         self.api_key = api_key
         self.model = config.GEMINI_MODEL
+        
+        # Adaptive cap on concurrent Gemini calls: backs off on 429/5xx, recovers on success
+        self.backpressure = BackpressureController(c_max=config.MAX_CONCURRENT_GEMINI_CALLS)
+        # Fail fast instead of waiting out timeouts while Gemini is down
+        self.circuit_breaker = CircuitBreaker()
+        # In-flight calls keyed by request content so duplicates share one call
+        self._inflight: Dict[Tuple, asyncio.Future] = {}
+        
         self._configure_client()
         
     def _configure_client(self) -> None:
@@ -34,9 +48,9 @@ class GeminiImageClient:
         try:
             genai.configure(api_key=self.api_key)
             self.client = genai.GenerativeModel(self.model)
-            logger.info(f"Initialized Gemini client with model: {self.model}")
+            logger.info("Initialized Gemini client with model: %s", self.model)
         except Exception as e:
-            logger.error(f"Failed to configure Gemini client: {e}")
+            logger.error("Failed to configure Gemini client: %s", e)
             raise GeminiAPIError(f"Failed to initialize Gemini client: {e}")
         return None
     
@@ -44,6 +58,8 @@ class GeminiImageClient:
         """
         Generate an image from a text prompt.
         
+        Identical concurrent prompts share a single Gemini call.
+        
         Args:
             prompt: Text description of the image to generate
             retry_count: Number of retry attempts on failure
@@ -55,29 +71,30 @@ class GeminiImageClient:
             GeminiAPIError: If image generation fails after retries
             ContentFilterError: If prompt is blocked by content filter
         """
-        logger.info(f"Generating image for prompt: '{prompt[:50]}...'")
+        return await self._single_flight(("generate", prompt), lambda: self._generate_image(prompt, retry_count))
+    
+    async def _generate_image(self, prompt: str, retry_count: int) -> bytes:
+        """Generate an image with retries (see generate_image)."""
+        logger.info("Generating image for prompt: '%s...'", prompt[:50])
         
         # PATTERN: Exponential backoff for retries
         for attempt in range(retry_count):
             try:
                 # CRITICAL: Run in executor for blocking I/O
-                loop = asyncio.get_event_loop()
-                response = await loop.run_in_executor(
-                    None,
-                    self._generate_sync,
-                    prompt
+                response = await self._call_gemini(
+                    self._generate_sync, prompt, final_attempt=attempt == retry_count - 1
                 )
                 logger.info("Image generated successfully")
                 return response
                 
-            except ContentFilterError:
-                # Don't retry content filter errors
+            except (ContentFilterError, CircuitOpenError):
+                # Don't retry content filter errors or calls rejected by the circuit breaker
                 raise
                 
             except Exception as e:
-                logger.warning(f"Generation attempt {attempt + 1} failed: {e}")
+                logger.warning("Generation attempt %s failed: %s", attempt + 1, e)
                 if attempt == retry_count - 1:
-                    logger.error(f"All generation attempts failed for prompt: {prompt[:50]}...")
+                    logger.error("All generation attempts failed for prompt: %s...", prompt[:50])
                     raise GeminiAPIError(f"Failed to generate image after {retry_count} attempts: {e}")
                 
                 # Exponential backoff
@@ -102,7 +119,7 @@ class GeminiImageClient:
             GeminiAPIError: If image fusion fails after retries
             ContentFilterError: If prompt is blocked by content filter
         """
-        logger.info(f"Fusing {len(image_data_list)} images with prompt: '{prompt[:50]}...'")
+        logger.info("Fusing %s images with prompt: '%s...'", len(image_data_list), prompt[:50])
         
         if len(image_data_list) < 2:
             raise GeminiAPIError("At least 2 images required for fusion")
@@ -113,20 +130,16 @@ class GeminiImageClient:
         for attempt in range(retry_count):
             try:
                 # CRITICAL: Run in executor for blocking I/O (same pattern as edit_image)
-                loop = asyncio.get_event_loop()
-                response = await loop.run_in_executor(
-                    None,
-                    self._fuse_sync,
-                    prompt,
-                    image_data_list
+                response = await self._call_gemini(
+                    self._fuse_sync, prompt, image_data_list, final_attempt=attempt == retry_count - 1
                 )
                 logger.info("Successfully fused multiple images")
                 return response
                 
-            except ContentFilterError:
-                raise  # Don't retry content filter errors
+            except (ContentFilterError, CircuitOpenError):
+                raise  # Don't retry content filter errors or calls rejected by the circuit breaker
             except Exception as e:
-                logger.warning(f"Image fusion attempt {attempt + 1} failed: {e}")
+                logger.warning("Image fusion attempt %s failed: %s", attempt + 1, e)
                 if attempt < retry_count - 1:
                     wait_time = 2 ** attempt  # Exponential backoff
                     await asyncio.sleep(wait_time)
@@ -138,6 +151,9 @@ class GeminiImageClient:
         """
         Edit an existing image based on a text prompt.
         
+        Identical concurrent requests (same image bytes and prompt) share a
+        single Gemini call instead of issuing duplicates.
+        
         Args:
             prompt: Text description of the desired edit
             image_data: Original image data as bytes
@@ -150,30 +166,78 @@ class GeminiImageClient:
             GeminiAPIError: If image editing fails after retries
             ContentFilterError: If prompt is blocked by content filter
         """
-        logger.info(f"Editing image with prompt: '{prompt[:50]}...'")
+        # Hashing a multi-MB upload takes milliseconds; hashlib releases the GIL,
+        # so do it on a worker thread rather than stalling the event loop
+        digest = await asyncio.to_thread(lambda: hashlib.blake2b(image_data, digest_size=16).digest())
+        key = ("edit", digest, prompt)
+        return await self._single_flight(key, lambda: self._edit_image(prompt, image_data, retry_count))
+    
+    async def _call_gemini(self, func: Callable[..., bytes], *args, final_attempt: bool = True) -> bytes:
+        """
+        Run a blocking Gemini call in the executor under flow control.
+        
+        Applies the circuit breaker and backpressure limit, and feeds the
+        outcome back to both.
+        
+        Args:
+            func: Synchronous call to run
+            *args: Arguments for func
+            final_attempt: False if the caller will retry this call on failure
+            
+        Returns:
+            Result of func
+            
+        Raises:
+            CircuitOpenError: If Gemini calls are currently suspended
+        """
+        return await guarded_call(
+            self.backpressure, self.circuit_breaker, func, *args, final_attempt=final_attempt
+        )
+    
+    async def _single_flight(self, key: Tuple, start: Callable[[], Awaitable[bytes]]) -> bytes:
+        """
+        Run a call once for all concurrent callers with the same key.
+        
+        Args:
+            key: Identifies identical requests
+            start: Starts the call when none is in flight for the key
+            
+        Returns:
+            Result of the shared call
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(start())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            logger.info("Joining in-flight %s call for identical request", key[0])
+        
+        # Shield so one cancelled caller does not cancel the shared call
+        return await asyncio.shield(task)
+    
+    async def _edit_image(self, prompt: str, image_data: bytes, retry_count: int) -> bytes:
+        """Edit an image with retries (see edit_image)."""
+        logger.info("Editing image with prompt: '%s...'", prompt[:50])
         
         # PATTERN: Exponential backoff for retries
         for attempt in range(retry_count):
             try:
                 # CRITICAL: Run in executor for blocking I/O
-                loop = asyncio.get_event_loop()
-                response = await loop.run_in_executor(
-                    None,
-                    self._edit_sync,
-                    prompt,
-                    image_data
+                response = await self._call_gemini(
+                    self._edit_sync, prompt, image_data, final_attempt=attempt == retry_count - 1
                 )
                 logger.info("Image edited successfully")
                 return response
                 
-            except ContentFilterError:
-                # Don't retry content filter errors
+            except (ContentFilterError, CircuitOpenError):
+                # Don't retry content filter errors or calls rejected by the circuit breaker
                 raise
                 
             except Exception as e:
-                logger.warning(f"Edit attempt {attempt + 1} failed: {e}")
+                logger.warning("Edit attempt %s failed: %s", attempt + 1, e)
                 if attempt == retry_count - 1:
-                    logger.error(f"All edit attempts failed for prompt: {prompt[:50]}...")
+                    logger.error("All edit attempts failed for prompt: %s...", prompt[:50])
                     raise GeminiAPIError(f"Failed to edit image after {retry_count} attempts: {e}")
                 
                 # Exponential backoff
@@ -198,15 +262,11 @@ class GeminiImageClient:
             GeminiAPIError: If fusion fails
         """
         try:
-            # Convert all images to PIL format
-            pil_images = []
+            # Wrap all images as request parts without decoding them
+            image_parts = []
             for img_data in image_data_list:
                 try:
-                    pil_image = Image.open(io.BytesIO(img_data))
-                    # Convert to RGB if necessary
-                    if pil_image.mode != 'RGB':
-                        pil_image = pil_image.convert('RGB')
-                    pil_images.append(pil_image)
+                    image_parts.append(self._image_part(img_data))
                 except Exception as e:
                     raise GeminiAPIError(f"Failed to process image: {e}")
             
@@ -214,7 +274,7 @@ class GeminiImageClient:
             fusion_prompt = f"Fuse and combine these images: {prompt}"
             
             # GOTCHA: Gemini expects specific format for prompt+images
-            content = [fusion_prompt] + pil_images
+            content = [fusion_prompt] + image_parts
             response = self.client.generate_content(content)
             
             # Check for content filter blocks
@@ -285,7 +345,7 @@ class GeminiImageClient:
         except ContentFilterError:
             raise
         except Exception as e:
-            logger.error(f"Sync generation error: {e}")
+            logger.error("Sync generation error: %s", e)
             raise GeminiAPIError(f"Generation failed: {e}")
     
     def _edit_sync(self, prompt: str, image_data: bytes) -> bytes:
@@ -304,8 +364,8 @@ class GeminiImageClient:
             GeminiAPIError: If editing fails
         """
         try:
-            # Convert bytes to PIL Image for Gemini
-            image = Image.open(io.BytesIO(image_data))
+            # Send the original bytes to Gemini
+            image = self._image_part(image_data)
             
             # Create edit prompt with image
             edit_prompt = f"Edit this image: {prompt}"
@@ -335,9 +395,30 @@ class GeminiImageClient:
         except ContentFilterError:
             raise
         except Exception as e:
-            logger.error(f"Sync edit error: {e}")
+            logger.error("Sync edit error: %s", e)
             raise GeminiAPIError(f"Edit failed: {e}")
     
+    def _image_part(self, image_data: bytes) -> Any:
+        """
+        Wrap image bytes as a Gemini request part.
+        
+        Handing the SDK a PIL image makes it decode the pixels and re-encode
+        them as lossless WebP on every attempt; supported formats are sent
+        as their original bytes instead, so only the header is parsed.
+        
+        Args:
+            image_data: Image bytes (any bytes-like object)
+            
+        Returns:
+            Inline blob dict, or a PIL image for formats Gemini does not accept
+        """
+        image = Image.open(io.BytesIO(image_data))  # Reads the header only
+        mime_type = image.get_format_mimetype()
+        if mime_type in INLINE_IMAGE_MIME_TYPES:
+            # The SDK's Blob only accepts bytes, not bytearray/memoryview
+            return {"mime_type": mime_type, "data": bytes(image_data)}
+        return image
+    
     def _validate_image_data(self, image_data: bytes) -> None:
         """
         Validate image data format and size.
@@ -375,5 +456,5 @@ class GeminiImageClient:
             await self.generate_image("test", retry_count=1)
             return True
         except Exception as e:
-            logger.warning(f"Health check failed: {e}")
+            logger.warning("Health check failed: %s", e)
             return False
\ No newline at end of file
@@ -0,0 +1,62 @@
+"""Re-encoding of generated images before they are uploaded to Discord."""
+
+import asyncio
+import io
+import logging
+from typing import Tuple
+
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+class ImageProcessor:
+    """
+    Shrinks generated PNGs to WebP before upload.
+
+    Gemini returns multi-megabyte PNGs and upload time to Discord dominates
+    what the user waits for, so large images are re-encoded on a worker
+    thread. The original bytes are kept whenever re-encoding does not help.
+    """
+
+    def __init__(self, min_size: int = 256 * 1024, quality: int = 85):
+        """
+        Initialize image processor.
+
+        Args:
+            min_size: Images smaller than this many bytes are sent as-is
+            quality: WebP quality (0-100)
+        """
+        self.min_size = min_size
+        self.quality = quality
+
+    async def compress(self, image_bytes: bytes) -> Tuple[bytes, str]:
+        """
+        Compress image bytes for upload without blocking the event loop.
+
+        Args:
+            image_bytes: Image data as returned by Gemini (PNG)
+
+        Returns:
+            Tuple of (image bytes, file extension without dot)
+        """
+        if len(image_bytes) < self.min_size:
+            return image_bytes, "png"
+
+        try:
+            compressed = await asyncio.to_thread(self._to_webp, image_bytes)
+        except Exception as e:
+            logger.warning("Image compression failed, sending original: %s", e)
+            return image_bytes, "png"
+
+        if len(compressed) >= len(image_bytes):
+            return image_bytes, "png"
+
+        logger.debug("Compressed image %s -> %s bytes", len(image_bytes), len(compressed))
+        return compressed, "webp"
+
+    def _to_webp(self, image_bytes: bytes) -> bytes:
+        """Re-encode image bytes as WebP (runs on a worker thread)."""
+        with Image.open(io.BytesIO(image_bytes)) as image:
+            buffer = io.BytesIO()
+            image.save(buffer, "WEBP", quality=self.quality, method=6)
+            return buffer.getvalue()
@@ -0,0 +1,88 @@
+"""In-memory cache of downloaded Discord attachments."""
+
+import logging
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+class AttachmentCache:
+    """
+    LRU cache with a TTL for attachment bytes keyed by Discord attachment ID.
+
+    Attachment IDs are immutable on Discord, so re-submitting the same upload
+    can reuse the bytes instead of downloading them again. Memory is bounded
+    by total size as well as entry count, since a single upload can be 8 MB.
+    """
+
+    def __init__(self, max_entries: int = 128, max_bytes: int = 32 * 1024 * 1024, ttl_seconds: float = 600):
+        """
+        Initialize attachment cache.
+
+        Args:
+            max_entries: Maximum number of attachments kept in memory
+            max_bytes: Maximum total size of cached attachments in bytes
+            ttl_seconds: Seconds before a cached attachment expires
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[int, Tuple[bytes, float]]" = OrderedDict()
+        self._total_bytes = 0
+
+    def get(self, attachment_id: int) -> Optional[bytes]:
+        """
+        Get cached bytes for an attachment.
+
+        Args:
+            attachment_id: Discord attachment ID
+
+        Returns:
+            Cached bytes, None if missing or expired
+        """
+        entry = self._entries.get(attachment_id)
+        if entry is None:
+            return None
+
+        data, stored_at = entry
+        if time.monotonic() - stored_at >= self.ttl_seconds:
+            self._remove(attachment_id)
+            return None
+
+        self._entries.move_to_end(attachment_id)
+        return data
+
+    def put(self, attachment_id: int, data: bytes) -> None:
+        """
+        Store bytes for an attachment, evicting the oldest entries on overflow.
+
+        Attachments larger than max_bytes are not cached.
+
+        Args:
+            attachment_id: Discord attachment ID
+            data: Downloaded attachment bytes
+        """
+        self._remove(attachment_id)
+        if len(data) > self.max_bytes:
+            return
+
+        self._entries[attachment_id] = (data, time.monotonic())
+        self._total_bytes += len(data)
+        while len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes:
+            _, (evicted, _) = self._entries.popitem(last=False)
+            self._total_bytes -= len(evicted)
+
+    def clear(self) -> None:
+        """Drop all cached attachments."""
+        self._entries.clear()
+        self._total_bytes = 0
+
+    def _remove(self, attachment_id: int) -> None:
+        """Drop one entry, if present, and release its size."""
+        entry = self._entries.pop(attachment_id, None)
+        if entry is not None:
+            self._total_bytes -= len(entry[0])
+
+# Global attachment cache instance
+attachment_cache = AttachmentCache()
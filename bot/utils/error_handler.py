@@ -4,6 +4,7 @@ import logging
 import traceback
 from typing import Optional
 import discord
+from google.api_core import exceptions as google_exceptions
 
 logger = logging.getLogger(__name__)
 
@@ -31,6 +32,15 @@ class GeminiAPIError(BananaBotError):
             user_message or "Failed to generate image. Please try again later."
         )
 
+class CircuitOpenError(GeminiAPIError):
+    """Gemini calls are suspended after repeated upstream failures."""
+    
+    def __init__(self, message: str, user_message: Optional[str] = None):
+        super().__init__(
+            message,
+            user_message or "Image generation is temporarily unavailable. Please try again in a minute."
+        )
+
 class ContentFilterError(BananaBotError):
     """Content filter related errors."""
     
@@ -84,7 +94,7 @@ class ErrorHandler:
             error: Exception that occurred
             ephemeral: Whether to send ephemeral response
         """
-        logger.error(f"Command error in {interaction.command}: {error}")
+        logger.error("Command error in %s: %s", interaction.command, error)
         logger.error(traceback.format_exc())
         
         # Determine user message
@@ -106,7 +116,7 @@ class ErrorHandler:
                     ephemeral=ephemeral
                 )
         except Exception as send_error:
-            logger.error(f"Failed to send error message: {send_error}")
+            logger.error("Failed to send error message: %s", send_error)
     
     @staticmethod
     def log_error(error: Exception, context: str = "") -> None:
@@ -118,9 +128,81 @@ class ErrorHandler:
             context: Additional context information
         """
         context_str = f" in {context}" if context else ""
-        logger.error(f"Error{context_str}: {error}")
+        logger.error("Error%s: %s", context_str, error)
         logger.error(traceback.format_exc())
     
+    @staticmethod
+    def is_overload_error(error: Exception) -> bool:
+        """
+        Check whether a failed Gemini call means the provider is overloaded.
+        
+        Service code wraps API errors in GeminiAPIError, so the implicit
+        exception context is searched for the original error as well.
+        
+        Args:
+            error: Exception raised by the call
+            
+        Returns:
+            True for 429 and 5xx responses, False otherwise
+        """
+        while error is not None:
+            if isinstance(error, (google_exceptions.TooManyRequests, google_exceptions.ServerError)):
+                return True
+            error = error.__context__
+        return False
+    
+    @staticmethod
+    def is_outage_error(error: Exception) -> bool:
+        """
+        Check whether a failed Gemini call means the provider is unreachable or down.
+        
+        Args:
+            error: Exception raised by the call
+            
+        Returns:
+            True for 5xx responses and network errors, False otherwise
+        """
+        while error is not None:
+            # The gRPC transport reports network failures as ServiceUnavailable/DeadlineExceeded
+            if isinstance(error, (google_exceptions.ServerError, ConnectionError, TimeoutError)):
+                return True
+            error = error.__context__
+        return False
+    
+    @staticmethod
+    def retry_after(error: Exception) -> Optional[float]:
+        """
+        Extract the wait the provider requested in an overload error.
+        
+        Gemini attaches a google.rpc.RetryInfo detail to 429 responses (a dict
+        over REST, a message over gRPC); plain HTTP responses may instead carry
+        a Retry-After header.
+        
+        Args:
+            error: Exception raised by the call
+            
+        Returns:
+            Seconds to wait, None if the provider gave no hint
+        """
+        while error is not None:
+            if isinstance(error, google_exceptions.GoogleAPICallError):
+                for detail in error.details or []:
+                    if isinstance(detail, dict) and "retryDelay" in detail:
+                        try:
+                            return float(str(detail["retryDelay"]).rstrip("s"))
+                        except ValueError:
+                            pass
+                    elif hasattr(detail, "retry_delay"):
+                        return detail.retry_delay.seconds + detail.retry_delay.nanos / 1e9
+                
+                headers = getattr(error.response, "headers", None) or {}
+                try:
+                    return float(headers["retry-after"])
+                except (KeyError, TypeError, ValueError):
+                    pass
+            error = error.__context__
+        return None
+    
 
 # Global error handler instance
 error_handler = ErrorHandler()
\ No newline at end of file
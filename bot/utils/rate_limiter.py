@@ -2,8 +2,12 @@
 
 import asyncio
 import logging
-from datetime import datetime, timedelta
-from typing import Dict, Optional, Any
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Deque, Dict, Optional, Any, Tuple
+
+from .error_handler import CircuitOpenError, ErrorHandler
 
 logger = logging.getLogger(__name__)
 
@@ -20,7 +24,10 @@ class RateLimitInfo:
         """
         self.max_requests = max_requests
         self.window_hours = window_hours
-        self.requests: list[datetime] = []
+        self.window_seconds = window_hours * 3600
+        # time.monotonic() stamps, appended in order so expired entries are always
+        # at the left; unaffected by wall-clock adjustments
+        self.requests: Deque[float] = deque()
         self.lock = asyncio.Lock()
     
     def is_limited(self) -> bool:
@@ -30,17 +37,27 @@ class RateLimitInfo:
         Returns:
             True if user is rate limited, False otherwise
         """
-        now = datetime.utcnow()
-        cutoff = now - timedelta(hours=self.window_hours)
-        
         # Remove old requests
-        self.requests = [req_time for req_time in self.requests if req_time > cutoff]
+        self.prune(time.monotonic() - self.window_seconds)
         
         return len(self.requests) >= self.max_requests
     
+    def prune(self, cutoff: float) -> None:
+        """
+        Drop requests made at or before the cutoff.
+        
+        Only pops expired entries off the left instead of rebuilding the list.
+        
+        Args:
+            cutoff: Oldest monotonic timestamp to keep (exclusive)
+        """
+        requests = self.requests
+        while requests and requests[0] <= cutoff:
+            requests.popleft()
+    
     def add_request(self) -> None:
         """Add a new request timestamp."""
-        self.requests.append(datetime.utcnow())
+        self.requests.append(time.monotonic())
     
     def time_until_reset(self) -> Optional[float]:
         """
@@ -52,12 +69,9 @@ class RateLimitInfo:
         if not self.requests:
             return None
         
-        oldest_request = min(self.requests)
-        reset_time = oldest_request + timedelta(hours=self.window_hours)
-        now = datetime.utcnow()
-        
-        if reset_time > now:
-            return (reset_time - now).total_seconds()
+        remaining = self.requests[0] + self.window_seconds - time.monotonic()
+        if remaining > 0:
+            return remaining
         
         return None
 
@@ -86,7 +100,7 @@ class RateLimiter:
         # Cleanup task will be started when needed
         self._cleanup_task = None
         
-        logger.info(f"Rate limiter initialized: {max_requests} requests per {window_hours} hours")
+        logger.info("Rate limiter initialized: %s requests per %s hours", max_requests, window_hours)
     
     async def check_user(self, user_id: str) -> bool:
         """
@@ -98,6 +112,22 @@ class RateLimiter:
         Returns:
             True if user can make request, False if rate limited
         """
+        allowed, _ = await self.check_and_status(user_id)
+        return allowed
+    
+    async def check_and_status(self, user_id: str) -> Tuple[bool, Dict[str, Any]]:
+        """
+        Atomic check-and-add that also returns the user's rate limit status.
+        
+        Saves a second lock round-trip through get_user_status when the caller
+        needs to explain a rejection.
+        
+        Args:
+            user_id: Discord user ID as string
+            
+        Returns:
+            Tuple of (allowed, status) where status matches get_user_status
+        """
         # Start cleanup task if not already running
         if self._cleanup_task is None:
             async with self._global_lock:
@@ -114,14 +144,21 @@ class RateLimiter:
         
         # ATOMIC: check and add in single lock to prevent race conditions
         async with user_info.lock:
-            if user_info.is_limited():
-                logger.warning(f"Rate limit exceeded for user {user_id} ({len(user_info.requests)}/{self.max_requests})")
-                return False
+            allowed = not user_info.is_limited()
+            if allowed:
+                # Add request atomically after check
+                user_info.add_request()
+                logger.debug("Request allowed for user %s (%s/%s)", user_id, len(user_info.requests), self.max_requests)
+            else:
+                logger.warning("Rate limit exceeded for user %s (%s/%s)", user_id, len(user_info.requests), self.max_requests)
             
-            # Add request atomically after check
-            user_info.add_request()
-            logger.debug(f"Request allowed for user {user_id} ({len(user_info.requests)}/{self.max_requests})")
-            return True
+            requests_used = len(user_info.requests)
+            return allowed, {
+                'limited': requests_used >= self.max_requests,
+                'requests_used': requests_used,
+                'requests_remaining': max(0, self.max_requests - requests_used),
+                'reset_time': user_info.time_until_reset()
+            }
     
     async def get_user_status(self, user_id: str) -> Dict[str, Any]:
         """
@@ -167,7 +204,7 @@ class RateLimiter:
         if user_id in self.users:
             async with self.users[user_id].lock:
                 self.users[user_id].requests.clear()
-                logger.info(f"Rate limit reset for user {user_id}")
+                logger.info("Rate limit reset for user %s", user_id)
                 return True
         
         return False
@@ -181,19 +218,18 @@ class RateLimiter:
             except asyncio.CancelledError:
                 break
             except Exception as e:
-                logger.error(f"Cleanup task error: {e}")
+                logger.error("Cleanup task error: %s", e)
     
     async def _cleanup_old_users(self) -> None:
         """Remove users with no recent requests."""
-        now = datetime.utcnow()
-        cutoff = now - timedelta(hours=self.window_hours * 2)  # Keep extra buffer
+        cutoff = time.monotonic() - self.window_hours * 2 * 3600  # Keep extra buffer
         
         users_to_remove = []
         
         for user_id, user_info in self.users.items():
             async with user_info.lock:
                 # Remove old requests first
-                user_info.requests = [req_time for req_time in user_info.requests if req_time > cutoff]
+                user_info.prune(cutoff)
                 
                 # Mark user for removal if no recent requests
                 if not user_info.requests:
@@ -204,7 +240,7 @@ class RateLimiter:
             del self.users[user_id]
         
         if users_to_remove:
-            logger.info(f"Cleaned up {len(users_to_remove)} inactive users")
+            logger.info("Cleaned up %s inactive users", len(users_to_remove))
     
     async def shutdown(self) -> None:
         """Clean shutdown of rate limiter."""
@@ -217,6 +253,249 @@ class RateLimiter:
         
         logger.info("Rate limiter shutdown complete")
 
+class ConcurrencyLimiter:
+    """
+    Per-user limit on requests in flight at the same time.
+    
+    Complements RateLimiter: the hourly limit caps request volume, while this
+    caps bursts of simultaneous commands from a single user so one user
+    cannot tie up every Gemini slot.
+    """
+    
+    def __init__(self, max_concurrent: int = 2):
+        """
+        Initialize concurrency limiter.
+        
+        Args:
+            max_concurrent: Maximum in-flight requests per user
+        """
+        self.max_concurrent = max_concurrent
+        self.in_flight: Dict[str, int] = {}
+        
+        logger.info("Concurrency limiter initialized: %s in-flight requests per user", max_concurrent)
+    
+    def acquire(self, user_id: str) -> bool:
+        """
+        Reserve an in-flight slot for a user.
+        
+        Runs without awaiting, so check-and-increment is atomic on the event loop.
+        
+        Args:
+            user_id: Discord user ID as string
+            
+        Returns:
+            True if a slot was reserved, False if the user is at the limit
+        """
+        count = self.in_flight.get(user_id, 0)
+        if count >= self.max_concurrent:
+            logger.warning("Concurrency limit reached for user %s (%s/%s)", user_id, count, self.max_concurrent)
+            return False
+        
+        self.in_flight[user_id] = count + 1
+        return True
+    
+    def release(self, user_id: str) -> None:
+        """
+        Release a slot previously reserved with acquire.
+        
+        Args:
+            user_id: Discord user ID as string
+        """
+        count = self.in_flight.get(user_id, 0) - 1
+        if count > 0:
+            self.in_flight[user_id] = count
+        else:
+            self.in_flight.pop(user_id, None)
+
+class BackpressureController:
+    """
+    Adaptive (AIMD) limit on concurrent calls to an upstream API.
+    
+    The limit grows additively after each successful call and shrinks
+    multiplicatively when the provider reports overload (429/5xx), so the bot
+    settles just below the provider's real capacity instead of hammering it
+    with a fixed number of parallel calls.
+    """
+    
+    def __init__(self, c_min: int = 1, c_max: int = 4, alpha: float = 0.5, beta: float = 0.5):
+        """
+        Initialize backpressure controller.
+        
+        Args:
+            c_min: Lowest concurrency limit
+            c_max: Highest concurrency limit (also the starting limit)
+            alpha: Amount added to the limit after a success
+            beta: Factor applied to the limit after an overload error
+        """
+        self.c_min = c_min
+        self.c_max = c_max
+        self.alpha = alpha
+        self.beta = beta
+        self.c = float(c_max)
+        self.in_flight = 0
+        self._condition = asyncio.Condition()
+        self._resume_at = 0.0  # Loop time before which no new call may start
+        
+        logger.info("Backpressure controller initialized: %s-%s concurrent calls", c_min, c_max)
+    
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Wait out any provider pause, then hold a slot under the current limit."""
+        loop = asyncio.get_running_loop()
+        while (delay := self._resume_at - loop.time()) > 0:
+            await asyncio.sleep(delay)
+        
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < int(self.c))
+            self.in_flight += 1
+        try:
+            yield
+        finally:
+            async with self._condition:
+                self.in_flight -= 1
+                # The limit may have grown, so wake every waiter to re-check
+                self._condition.notify_all()
+    
+    def on_success(self) -> None:
+        """Additively raise the limit after a successful call."""
+        self.c = min(self.c_max, self.c + self.alpha)
+    
+    def on_error(self, retry_after: Optional[float] = None) -> None:
+        """
+        Multiplicatively lower the limit after an overload error.
+        
+        Args:
+            retry_after: Seconds the provider asked us to wait; no new call
+                starts until then
+        """
+        self.c = max(self.c_min, self.c * self.beta)
+        logger.warning("Upstream overloaded, concurrency limit lowered to %s", int(self.c))
+        
+        if retry_after:
+            loop = asyncio.get_running_loop()
+            self._resume_at = max(self._resume_at, loop.time() + retry_after)
+            logger.warning("Pausing upstream calls for %.1fs as requested by provider", retry_after)
+
+class CircuitBreaker:
+    """
+    Fail fast while an upstream API is down.
+    
+    After failure_threshold failed requests within failure_window seconds the
+    circuit opens and calls are rejected immediately for reset_timeout
+    seconds. Then a single probe call is let through: success closes the
+    circuit, failure opens it again.
+    """
+    
+    def __init__(self, failure_threshold: int = 3, failure_window: float = 30.0, reset_timeout: float = 60.0):
+        """
+        Initialize circuit breaker.
+        
+        Args:
+            failure_threshold: Failed requests (after their retries) that open the circuit
+            failure_window: Seconds within which those errors must occur
+            reset_timeout: Seconds the circuit stays open before a probe
+        """
+        self.failure_threshold = failure_threshold
+        self.failure_window = failure_window
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures: list[float] = []
+        self.opened_at = 0.0
+    
+    @property
+    def is_open(self) -> bool:
+        """True while calls are being rejected (open, or a probe is in flight)."""
+        return self.state != "closed" and time.monotonic() - self.opened_at < self.reset_timeout
+    
+    def before_call(self) -> None:
+        """
+        Check that a call may go ahead.
+        
+        Raises:
+            CircuitOpenError: If the circuit is open
+        """
+        if self.state == "closed":
+            return
+        
+        now = time.monotonic()
+        if now - self.opened_at < self.reset_timeout:
+            raise CircuitOpenError(f"Circuit open, retrying in {self.reset_timeout - (now - self.opened_at):.0f}s")
+        
+        # Let one probe through; if it never reports back, another is allowed after reset_timeout
+        self.state = "half_open"
+        self.opened_at = now
+        logger.info("Circuit half-open, probing upstream")
+    
+    def on_success(self) -> None:
+        """Record that the upstream answered."""
+        if self.state != "closed":
+            logger.info("Circuit closed, upstream recovered")
+        self.state = "closed"
+        self.failures.clear()
+    
+    def on_failure(self) -> None:
+        """Record an outage error, opening the circuit when the threshold is reached."""
+        now = time.monotonic()
+        self.failures = [t for t in self.failures if now - t < self.failure_window]
+        self.failures.append(now)
+        
+        if self.state == "half_open" or len(self.failures) >= self.failure_threshold:
+            self.state = "open"
+            self.opened_at = now
+            self.failures.clear()
+            logger.warning("Circuit opened, rejecting upstream calls for %.0fs", self.reset_timeout)
+
+async def guarded_call(
+    backpressure: BackpressureController,
+    circuit_breaker: CircuitBreaker,
+    func: Callable[..., Any],
+    *args: Any,
+    final_attempt: bool = True
+) -> Any:
+    """
+    Run a blocking upstream call in the executor under flow control.
+    
+    Every Gemini call path goes through here so they apply the circuit
+    breaker and backpressure limit the same way and feed the outcome back
+    to both. Backpressure reacts to every attempt, but an outage counts
+    towards the breaker once per logical request, when its last attempt
+    fails, so one command's retries cannot open the circuit for everyone.
+    
+    Args:
+        backpressure: Adaptive concurrency limit for the upstream
+        circuit_breaker: Breaker tracking upstream outages
+        func: Synchronous call to run
+        *args: Arguments for func
+        final_attempt: False if the caller will retry this call on failure
+        
+    Returns:
+        Result of func
+        
+    Raises:
+        CircuitOpenError: If upstream calls are currently suspended
+    """
+    circuit_breaker.before_call()
+    loop = asyncio.get_running_loop()
+    
+    try:
+        async with backpressure.slot():
+            result = await loop.run_in_executor(None, func, *args)
+            backpressure.on_success()
+    except Exception as e:
+        if ErrorHandler.is_overload_error(e):
+            backpressure.on_error(ErrorHandler.retry_after(e))
+        if ErrorHandler.is_outage_error(e):
+            # A failed half-open probe reopens the circuit straight away
+            if final_attempt or circuit_breaker.state == "half_open":
+                circuit_breaker.on_failure()
+        else:
+            # The upstream answered (e.g. a content filter block), so it is up
+            circuit_breaker.on_success()
+        raise
+    
+    circuit_breaker.on_success()
+    return result
+
 # Global rate limiter instances (will be initialized by bot)
 default_rate_limiter: Optional[RateLimiter] = None
 fusion_rate_limiter: Optional[RateLimiter] = None  # Separate limiter for fusion commands
\ No newline at end of file
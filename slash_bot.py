@@ -4,14 +4,15 @@ Public Version - Safe for GitHub
 """
 
 import asyncio
+import functools
 import io
 import logging
 import os
 import platform
+import secrets
 import sys
-import uuid
 from pathlib import Path
-from typing import Optional, List
+from typing import Optional, List, Set
 from datetime import datetime
 
 import aiohttp
@@ -22,8 +23,12 @@ from discord.ext import commands
 from bot.config import config, ConfigError
 from bot.services.gemini_client import GeminiImageClient
 from bot.services.batch_client_v2 import GeminiBatchProcessor, BatchManager
-from bot.utils.rate_limiter import RateLimiter
-from bot.models import UserGallery, ImageWork, UserStats, ensure_data_directories
+from bot.services.gallery_cache import GalleryCache
+from bot.services.image_processor import ImageProcessor
+from bot.utils.rate_limiter import RateLimiter, ConcurrencyLimiter
+from bot.utils.attachment_cache import attachment_cache
+from bot.utils.error_handler import ImageProcessingError
+from bot.models import ImageWork, ensure_data_directories
 
 # Ensure .env file exists
 if not os.path.isfile(f"{os.path.realpath(os.path.dirname(__file__))}/.env"):
@@ -41,6 +46,34 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+# Attachment MIME types accepted by the image commands
+SUPPORTED_CONTENT_TYPES = frozenset({"image/png", "image/jpeg", "image/webp", "image/gif"})
+
+# Embed templates, filled per request through discord.Embed.from_dict
+RESULT_EMBED_COLOR = 0x00FF00
+ERROR_EMBED_COLOR = 0xE02B2B
+RESULT_EMBED_FOOTER = {"text": "Use /gallery to see all your works"}
+RATE_LIMIT_TIP = "Rate limits ensure fair usage and optimal performance for all users."
+FUSION_RATE_LIMIT_TIP = "Image fusion uses 1 rate limit slot regardless of image count"
+
+# Slash command parameter descriptions, built once at import
+GENERATE_WITH_IMAGE_DESCRIBE = {
+    "prompt": "Describe how to modify the image",
+    "image": "The image to edit",
+}
+GENERATE_LINK_DESCRIBE = {
+    "prompt": "Describe how to modify the image",
+    "image_url": "URL of the image to edit",
+}
+FUSE_IMAGES_DESCRIBE = {
+    "prompt": "Describe how to combine/fuse multiple images",
+    "image1": "First image to fuse",
+    "image2": "Second image to fuse",
+    "image3": "Third image (optional)",
+    "image4": "Fourth image (optional)",
+    "image5": "Fifth image (optional)",
+}
+
 
 class BananaBot(commands.Bot):
     """
@@ -54,7 +87,7 @@ class BananaBot(commands.Bot):
         try:
             config.validate_config()
         except ConfigError as e:
-            logger.error(f"Configuration validation failed: {e}")
+            logger.error("Configuration validation failed: %s", e)
             sys.exit(1)
         
         intents = discord.Intents.default()
@@ -70,7 +103,12 @@ class BananaBot(commands.Bot):
         self.gemini_client: Optional[GeminiImageClient] = None
         self.batch_processor: Optional[GeminiBatchProcessor] = None
         self.batch_manager: Optional[BatchManager] = None
+        self.gallery_cache: Optional[GalleryCache] = None
+        self.image_processor: Optional[ImageProcessor] = None
         self.rate_limiter: Optional[RateLimiter] = None
+        self.concurrency_limiter: Optional[ConcurrencyLimiter] = None
+        self.http_session: Optional[aiohttp.ClientSession] = None
+        self._persist_tasks: Set[asyncio.Task] = set()  # Pending gallery/stats updates
 
         logger.info("BananaBot initialized with slash commands")
 
@@ -90,8 +128,25 @@ class BananaBot(commands.Bot):
         # Add slash commands
         self._add_commands()
 
+        # Sync once here rather than in on_ready, which fires again on every reconnect
+        try:
+            synced = await self.tree.sync()
+            logger.info("Synced %d slash commands", len(synced))
+        except Exception as e:
+            logger.error("Failed to sync commands: %s", e)
+
         logger.info("Bot setup completed")
     
+    async def close(self) -> None:
+        """Flush cached user data and close HTTP connections before disconnecting."""
+        if self._persist_tasks:
+            await asyncio.gather(*self._persist_tasks, return_exceptions=True)
+        if self.gallery_cache is not None:
+            await self.gallery_cache.shutdown()
+        if self.http_session is not None:
+            await self.http_session.close()
+        await super().close()
+    
     async def get_health_status(self) -> dict:
         """Get health status for monitoring."""
         status = {
@@ -130,8 +185,8 @@ class BananaBot(commands.Bot):
         """Process prompts using batch or regular API based on configuration."""
         if await self._should_use_batch(user_id, prompts):
             # Use batch processing
-            logger.info(f"Using batch processing for {len(prompts)} prompts")
-            batch_id = str(uuid.uuid4())[:8]
+            logger.info("Using batch processing for %d prompts", len(prompts))
+            batch_id = secrets.token_hex(4)
             results = await self.batch_processor.process_batch(prompts, user_id, batch_id)
             
             # Convert batch results to standard format
@@ -159,10 +214,268 @@ class BananaBot(commands.Bot):
                         'batch_id': None
                     })
                 except Exception as e:
-                    logger.error(f"Regular generation failed for prompt '{prompt}': {e}")
+                    logger.error("Regular generation failed for prompt '%s': %s", prompt, e)
                     # Continue with other prompts
             return processed_results
 
+    def _concurrency_limited(self, func):
+        """
+        Wrap a slash command so each user has a bounded number of runs in flight.
+        
+        Also fails fast while Gemini's circuit breaker is open. Rejected
+        invocations get an ephemeral message and do not consume an hourly
+        rate-limit slot.
+        """
+        @functools.wraps(func)
+        async def wrapper(interaction: discord.Interaction, *args, **kwargs):
+            user_id = str(interaction.user.id)
+            if self.gemini_client.circuit_breaker.is_open:
+                embed = discord.Embed(
+                    title="🔌 Service Unavailable",
+                    description="Image generation is temporarily unavailable. Please try again in a minute.",
+                    color=ERROR_EMBED_COLOR
+                )
+                await interaction.response.send_message(embed=embed, ephemeral=True)
+                return
+            
+            if not self.concurrency_limiter.acquire(user_id):
+                embed = discord.Embed(
+                    title="⏳ Too Many Requests",
+                    description="Please wait for your current image to finish before starting another.",
+                    color=ERROR_EMBED_COLOR
+                )
+                await interaction.response.send_message(embed=embed, ephemeral=True)
+                return
+            
+            try:
+                await func(interaction, *args, **kwargs)
+            finally:
+                self.concurrency_limiter.release(user_id)
+        
+        return wrapper
+
+    def _is_valid_attachment(self, attachment: discord.Attachment) -> bool:
+        """Check that an attachment is declared as a supported image type."""
+        return attachment.content_type in SUPPORTED_CONTENT_TYPES
+
+    async def _read_attachment(self, attachment: discord.Attachment) -> bytes:
+        """
+        Read an attachment, reusing cached bytes when the same upload is resubmitted.
+
+        Args:
+            attachment: Discord attachment to read
+
+        Returns:
+            Attachment bytes
+        """
+        image_data = attachment_cache.get(attachment.id)
+        if image_data is None:
+            image_data = await attachment.read()
+            attachment_cache.put(attachment.id, image_data)
+        return image_data
+
+    async def _download_attachments(self, attachments: List[discord.Attachment]) -> List[bytes]:
+        """
+        Download several attachments concurrently, fetching repeated ones only once.
+
+        Args:
+            attachments: Discord attachments to read
+
+        Returns:
+            Image bytes in the same order as the attachments
+        """
+        unique = list({attachment.id: attachment for attachment in attachments}.values())
+        data_list = await asyncio.gather(*(self._read_attachment(attachment) for attachment in unique))
+        data_by_id = {attachment.id: data for attachment, data in zip(unique, data_list)}
+        return [data_by_id[attachment.id] for attachment in attachments]
+
+    def _record_work(self, user_id: str, work: ImageWork) -> None:
+        """
+        Record a work in the user's gallery and stats without delaying the reply.
+
+        The first command from a user loads their files from disk, so recording
+        runs as a background task; failures are logged instead of failing the
+        command that already produced the image.
+
+        Args:
+            user_id: Discord user ID as string
+            work: Newly created work
+        """
+        task = asyncio.create_task(self.gallery_cache.record_work(user_id, work))
+        self._persist_tasks.add(task)
+        task.add_done_callback(functools.partial(self._on_work_recorded, user_id))
+
+    def _on_work_recorded(self, user_id: str, task: asyncio.Task) -> None:
+        """Forget a finished record task and log its failure, if any."""
+        self._persist_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Failed to record work for user %s: %s", user_id, task.exception())
+
+    async def _image_file(self, image_bytes: bytes, name: str) -> discord.File:
+        """
+        Build an upload for a generated image, compressed off the event loop.
+
+        Args:
+            image_bytes: Generated image bytes
+            name: File name without extension
+
+        Returns:
+            Discord file whose extension matches the encoded bytes
+        """
+        data, ext = await self.image_processor.compress(image_bytes)
+        return discord.File(io.BytesIO(data), filename=f"{name}.{ext}")
+
+    def _result_embed(
+        self,
+        title: str,
+        description: str,
+        fields: List[dict],
+        footer: dict = RESULT_EMBED_FOOTER
+    ) -> discord.Embed:
+        """
+        Build a success embed from the shared template in a single from_dict call.
+
+        Args:
+            title: Embed title
+            description: Embed description
+            fields: Field dicts with name, value and inline keys
+            footer: Footer dict
+
+        Returns:
+            Ready-to-send embed
+        """
+        return discord.Embed.from_dict({
+            "title": title,
+            "description": description,
+            "color": RESULT_EMBED_COLOR,
+            "fields": fields,
+            "footer": footer,
+        })
+
+    def _rate_limited_embed(
+        self,
+        requests_used: int,
+        max_requests: int,
+        reset_time: Optional[float],
+        tip: str = RATE_LIMIT_TIP,
+        label: str = "requests"
+    ) -> discord.Embed:
+        """
+        Build the rate-limited embed shared by all image commands.
+
+        Args:
+            requests_used: Requests used in the current window
+            max_requests: Requests allowed per window
+            reset_time: Seconds until the window resets, if known
+            tip: Tip shown below the reset time
+            label: Name of the limited resource, e.g. "fusion requests"
+
+        Returns:
+            Ready-to-send embed
+        """
+        fields = []
+        if reset_time:
+            minutes = int(reset_time / 60)
+            seconds = int(reset_time % 60)
+            fields.append({"name": "Reset Time", "value": f"⏱️ {minutes}m {seconds}s", "inline": False})
+        fields.append({"name": "💡 Tip", "value": tip, "inline": False})
+        
+        return discord.Embed.from_dict({
+            "title": "⏰ Rate Limited",
+            "description": f"You've used {requests_used}/{max_requests} {label} this hour.",
+            "color": ERROR_EMBED_COLOR,
+            "fields": fields,
+        })
+
+    async def _download_url(self, url: str) -> bytes:
+        """
+        Stream an image from a URL, enforcing the size limit as chunks arrive.
+
+        Args:
+            url: Image URL to download
+
+        Returns:
+            Downloaded image bytes
+
+        Raises:
+            ImageProcessingError: If the download fails or exceeds the size limit
+        """
+        max_bytes = config.MAX_IMAGE_SIZE_MB * 1024 * 1024
+        
+        async with self.http_session.get(url) as response:
+            if response.status != 200:
+                raise ImageProcessingError(f"Failed to download image: HTTP {response.status}")
+            
+            expected = response.content_length
+            if expected is not None and expected > max_bytes:
+                raise ImageProcessingError(f"Image too large: {expected} bytes")
+            
+            chunks = []
+            received = 0
+            async for chunk in response.content.iter_chunked(64 * 1024):
+                received += len(chunk)
+                if received > max_bytes:
+                    raise ImageProcessingError(f"Image too large: over {max_bytes} bytes")
+                chunks.append(chunk)
+            
+            # One copy into the final bytes object; no resizing or trimming
+            return b"".join(chunks)
+
+    async def _edit_core(
+        self,
+        interaction: discord.Interaction,
+        user_id: str,
+        prompt: str,
+        image_data: bytes,
+        work_prompt: str,
+        title: str
+    ) -> ImageWork:
+        """
+        Edit an image, record it in the user's gallery and send the result.
+
+        Shared by every command that edits a single source image.
+
+        Args:
+            interaction: Deferred Discord interaction to reply to
+            user_id: Discord user ID as string
+            prompt: Edit instruction sent to Gemini
+            image_data: Source image bytes
+            work_prompt: Prompt stored in the gallery
+            title: Title of the result embed
+
+        Returns:
+            The saved work record
+        """
+        # Edit image
+        image_bytes = await self.gemini_client.edit_image(
+            prompt=prompt,
+            image_data=image_data
+        )
+        
+        # Save to user gallery and stats
+        work_id = secrets.token_hex(4)
+        work = ImageWork(
+            id=work_id,
+            user_id=user_id,
+            prompt=work_prompt,
+            image_url=f"work_{work_id}.png",
+            generation_type="edit",
+            cost=0.039
+        )
+        self._record_work(user_id, work)
+        
+        # Send result
+        file = await self._image_file(image_bytes, work.id)
+        
+        embed = self._result_embed(
+            title,
+            f"**Edit:** {prompt}",
+            [{"name": "Work ID", "value": f"`{work.id}`", "inline": True}]
+        )
+        
+        await interaction.followup.send(file=file, embed=embed)
+        return work
+
     async def _init_services(self) -> None:
         """Initialize external services."""
         try:
@@ -170,9 +483,25 @@ class BananaBot(commands.Bot):
             self.gemini_client = GeminiImageClient(config.GEMINI_API_KEY)
             
             # Initialize batch processing
-            self.batch_processor = GeminiBatchProcessor(config.GEMINI_API_KEY)
+            self.batch_processor = GeminiBatchProcessor(
+                config.GEMINI_API_KEY,
+                backpressure=self.gemini_client.backpressure,
+                circuit_breaker=self.gemini_client.circuit_breaker
+            )
             self.batch_manager = BatchManager(self.batch_processor)
-
+            
+            # Shared HTTP session so URL downloads reuse pooled keep-alive connections
+            self.http_session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=50, limit_per_host=20, ttl_dns_cache=300)
+            )
+            
+            # In-memory gallery/stats with periodic write-back
+            self.gallery_cache = GalleryCache()
+            self.gallery_cache.start()
+            
+            # Shrink generated images before upload
+            self.image_processor = ImageProcessor()
+            
             # Initialize rate limiters with different limits
             # Fusion commands: limited separately (more expensive due to multi-image input tokens)
             self.fusion_rate_limiter = RateLimiter(
@@ -186,17 +515,20 @@ class BananaBot(commands.Bot):
                 window_hours=1,
                 cleanup_interval=config.RATE_LIMITER_CLEANUP_INTERVAL
             )
+            # Per-user cap on simultaneous image commands
+            self.concurrency_limiter = ConcurrencyLimiter(config.MAX_CONCURRENT_REQUESTS_PER_USER)
 
             logger.info("All services initialized successfully")
 
         except Exception as e:
-            logger.error(f"Service initialization failed: {e}")
+            logger.error("Service initialization failed: %s", e)
             raise
 
     def _add_commands(self) -> None:
         """Add all slash commands to the bot."""
         
         @self.tree.command(name="generate", description="Generate an AI image from text")
+        @self._concurrency_limited
         @app_commands.describe(prompt="Describe the image you want to create")
         async def generate(interaction: discord.Interaction, prompt: str):
             """Generate an image from text prompt."""
@@ -205,29 +537,12 @@ class BananaBot(commands.Bot):
             user_id = str(interaction.user.id)
             
             # Check rate limit with detailed feedback
-            if not await self.rate_limiter.check_user(user_id):
-                status = await self.rate_limiter.get_user_status(user_id)
+            allowed, status = await self.rate_limiter.check_and_status(user_id)
+            if not allowed:
                 reset_time = status.get('reset_time')
                 requests_used = status.get('requests_used', 0)
                 
-                embed = discord.Embed(
-                    title="⏰ Rate Limited",
-                    description=f"You've used {requests_used}/{config.MAX_REQUESTS_PER_HOUR} requests this hour.",
-                    color=0xE02B2B
-                )
-                if reset_time:
-                    minutes = int(reset_time / 60)
-                    seconds = int(reset_time % 60)
-                    embed.add_field(
-                        name="Reset Time", 
-                        value=f"⏱️ {minutes}m {seconds}s", 
-                        inline=False
-                    )
-                embed.add_field(
-                    name="💡 Tip", 
-                    value="Rate limits ensure fair usage and optimal performance for all users.", 
-                    inline=False
-                )
+                embed = self._rate_limited_embed(requests_used, config.MAX_REQUESTS_PER_HOUR, reset_time)
                 await interaction.followup.send(embed=embed)
                 return
 
@@ -240,42 +555,33 @@ class BananaBot(commands.Bot):
                 
                 result = results[0]  # Single prompt result
                 
-                # Save to user gallery
-                gallery = UserGallery.load(user_id)
+                # Save to user gallery and stats
+                work_id = secrets.token_hex(4)
                 work = ImageWork(
-                    id=str(uuid.uuid4())[:8],
+                    id=work_id,
                     user_id=user_id,
                     prompt=result['prompt'],
-                    image_url=f"work_{str(uuid.uuid4())[:8]}.png",
+                    image_url=f"work_{work_id}.png",
                     generation_type=result['generation_type'],
                     cost=result['cost'],
                     batch_id=result['batch_id']
                 )
-                gallery.add_work(work)
-                
-                # Update user stats
-                stats = UserStats.load(user_id)
-                stats.update_stats(work)
+                self._record_work(user_id, work)
                 
                 # Send result
-                file = discord.File(io.BytesIO(result['image_bytes']), filename=f"{work.id}.png")
+                file = await self._image_file(result['image_bytes'], work.id)
                 
-                embed = discord.Embed(
-                    title="🍌 Image Created!",
-                    description=f"**Prompt:** {result['prompt']}",
-                    color=0x00FF00
-                )
-                embed.add_field(name="Work ID", value=f"`{work.id}`", inline=True)
+                fields = [{"name": "Work ID", "value": f"`{work.id}`", "inline": True}]
                 if result['batch_id']:
-                    embed.add_field(name="Batch ID", value=f"`{result['batch_id']}`", inline=True)
-                    embed.add_field(name="⚡ Optimized", value="Enhanced processing!", inline=True)
-                embed.set_footer(text="Use /gallery to see all your works")
+                    fields.append({"name": "Batch ID", "value": f"`{result['batch_id']}`", "inline": True})
+                    fields.append({"name": "⚡ Optimized", "value": "Enhanced processing!", "inline": True})
+                embed = self._result_embed("🍌 Image Created!", f"**Prompt:** {result['prompt']}", fields)
                 
                 await interaction.followup.send(file=file, embed=embed)
-                logger.info(f"Generated image for user {user_id}: {result['prompt']} (Cost: ${result['cost']:.4f})")
+                logger.info("Generated image for user %s: %s (Cost: $%.4f)", user_id, result['prompt'], result['cost'])
                 
             except Exception as e:
-                logger.error(f"Image generation failed for user {user_id}: {e}")
+                logger.error("Image generation failed for user %s: %s", user_id, e)
                 embed = discord.Embed(
                     title="Generation Failed",
                     description="Sorry, image generation failed. Please try again with a different prompt.",
@@ -284,48 +590,38 @@ class BananaBot(commands.Bot):
                 await interaction.followup.send(embed=embed)
 
         @self.tree.command(name="generate-with-image", description="Edit an attached image with AI")
-        @app_commands.describe(
-            prompt="Describe how to modify the image",
-            image="The image to edit"
-        )
+        @self._concurrency_limited
+        @app_commands.describe(**GENERATE_WITH_IMAGE_DESCRIBE)
         async def generate_with_image(interaction: discord.Interaction, prompt: str, image: discord.Attachment):
             """Edit an attached image using AI."""
             await interaction.response.defer()
             
             user_id = str(interaction.user.id)
             
+            # Start the download while the rate limit is checked;
+            # the check does not depend on the image bytes. Oversized uploads
+            # are rejected from their declared size without being read into memory.
+            read_task = None
+            if self._is_valid_attachment(image) and image.size <= config.MAX_IMAGE_SIZE_MB * 1024 * 1024:
+                read_task = asyncio.create_task(self._read_attachment(image))
+            
             # Check rate limit with detailed feedback
-            if not await self.rate_limiter.check_user(user_id):
-                status = await self.rate_limiter.get_user_status(user_id)
+            allowed, status = await self.rate_limiter.check_and_status(user_id)
+            if not allowed:
+                if read_task is not None:
+                    read_task.cancel()
                 reset_time = status.get('reset_time')
                 requests_used = status.get('requests_used', 0)
                 
-                embed = discord.Embed(
-                    title="⏰ Rate Limited",
-                    description=f"You've used {requests_used}/{config.MAX_REQUESTS_PER_HOUR} requests this hour.",
-                    color=0xE02B2B
-                )
-                if reset_time:
-                    minutes = int(reset_time / 60)
-                    seconds = int(reset_time % 60)
-                    embed.add_field(
-                        name="Reset Time", 
-                        value=f"⏱️ {minutes}m {seconds}s", 
-                        inline=False
-                    )
-                embed.add_field(
-                    name="💡 Tip", 
-                    value="Rate limits ensure fair usage and optimal performance for all users.", 
-                    inline=False
-                )
+                embed = self._rate_limited_embed(requests_used, config.MAX_REQUESTS_PER_HOUR, reset_time)
                 await interaction.followup.send(embed=embed)
                 return
 
             # Validate image
-            if not image.content_type or not image.content_type.startswith('image/'):
+            if read_task is None:
                 embed = discord.Embed(
                     title="Invalid File",
-                    description="Please attach a valid image file (PNG, JPG, etc.).",
+                    description=f"Please attach a valid image file (PNG, JPG, etc.) under {config.MAX_IMAGE_SIZE_MB}MB.",
                     color=0xE02B2B
                 )
                 await interaction.followup.send(embed=embed)
@@ -333,46 +629,13 @@ class BananaBot(commands.Bot):
 
             try:
                 # Download image
-                image_data = await image.read()
-                
-                # Edit image
-                image_bytes = await self.gemini_client.edit_image(
-                    prompt=prompt,
-                    image_data=image_data
-                )
-                
-                # Save to user gallery
-                gallery = UserGallery.load(user_id)
-                work = ImageWork(
-                    id=str(uuid.uuid4())[:8],
-                    user_id=user_id,
-                    prompt=prompt,
-                    image_url=f"work_{str(uuid.uuid4())[:8]}.png",
-                    generation_type="edit",
-                    cost=0.039
-                )
-                gallery.add_work(work)
-                
-                # Update user stats
-                stats = UserStats.load(user_id)
-                stats.update_stats(work)
-                
-                # Send result
-                file = discord.File(io.BytesIO(image_bytes), filename=f"{work.id}.png")
-                
-                embed = discord.Embed(
-                    title="🍌 Image Edited!",
-                    description=f"**Edit:** {prompt}",
-                    color=0x00FF00
-                )
-                embed.add_field(name="Work ID", value=f"`{work.id}`", inline=True)
-                embed.set_footer(text="Use /gallery to see all your works")
-                
-                await interaction.followup.send(file=file, embed=embed)
-                logger.info(f"Edited image for user {user_id}: {prompt}")
+                image_data = await read_task
+
+                await self._edit_core(interaction, user_id, prompt, image_data, prompt, "🍌 Image Edited!")
+                logger.info("Edited image for user %s: %s", user_id, prompt)
                 
             except Exception as e:
-                logger.error(f"Image edit failed for user {user_id}: {e}")
+                logger.error("Image edit failed for user %s: %s", user_id, e)
                 embed = discord.Embed(
                     title="Edit Failed",
                     description="Sorry, image editing failed. Please try again.",
@@ -381,10 +644,8 @@ class BananaBot(commands.Bot):
                 await interaction.followup.send(embed=embed)
 
         @self.tree.command(name="generate-link", description="Generate an image from an image URL")
-        @app_commands.describe(
-            prompt="Describe how to modify the image",
-            image_url="URL of the image to edit"
-        )
+        @self._concurrency_limited
+        @app_commands.describe(**GENERATE_LINK_DESCRIBE)
         async def generate_link(interaction: discord.Interaction, prompt: str, image_url: str):
             """Edit an image from a URL."""
             await interaction.response.defer()
@@ -392,78 +653,27 @@ class BananaBot(commands.Bot):
             user_id = str(interaction.user.id)
             
             # Check rate limit with detailed feedback
-            if not await self.rate_limiter.check_user(user_id):
-                status = await self.rate_limiter.get_user_status(user_id)
+            allowed, status = await self.rate_limiter.check_and_status(user_id)
+            if not allowed:
                 reset_time = status.get('reset_time')
                 requests_used = status.get('requests_used', 0)
                 
-                embed = discord.Embed(
-                    title="⏰ Rate Limited",
-                    description=f"You've used {requests_used}/{config.MAX_REQUESTS_PER_HOUR} requests this hour.",
-                    color=0xE02B2B
-                )
-                if reset_time:
-                    minutes = int(reset_time / 60)
-                    seconds = int(reset_time % 60)
-                    embed.add_field(
-                        name="Reset Time", 
-                        value=f"⏱️ {minutes}m {seconds}s", 
-                        inline=False
-                    )
-                embed.add_field(
-                    name="💡 Tip", 
-                    value="Rate limits ensure fair usage and optimal performance for all users.", 
-                    inline=False
-                )
+                embed = self._rate_limited_embed(requests_used, config.MAX_REQUESTS_PER_HOUR, reset_time)
                 await interaction.followup.send(embed=embed)
                 return
 
             try:
                 # Download image from URL
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(image_url) as response:
-                        if response.status != 200:
-                            raise Exception("Failed to download image")
-                        image_data = await response.read()
-                
-                # Edit image
-                image_bytes = await self.gemini_client.edit_image(
-                    prompt=prompt,
-                    image_data=image_data
-                )
-                
-                # Save to user gallery
-                gallery = UserGallery.load(user_id)
-                work = ImageWork(
-                    id=str(uuid.uuid4())[:8],
-                    user_id=user_id,
-                    prompt=f"{prompt} (from URL)",
-                    image_url=f"work_{str(uuid.uuid4())[:8]}.png",
-                    generation_type="edit",
-                    cost=0.039
-                )
-                gallery.add_work(work)
-                
-                # Update user stats
-                stats = UserStats.load(user_id)
-                stats.update_stats(work)
+                image_data = await self._download_url(image_url)
                 
-                # Send result
-                file = discord.File(io.BytesIO(image_bytes), filename=f"{work.id}.png")
-                
-                embed = discord.Embed(
-                    title="🍌 Image Edited from URL!",
-                    description=f"**Edit:** {prompt}",
-                    color=0x00FF00
+                await self._edit_core(
+                    interaction, user_id, prompt, image_data,
+                    f"{prompt} (from URL)", "🍌 Image Edited from URL!"
                 )
-                embed.add_field(name="Work ID", value=f"`{work.id}`", inline=True)
-                embed.set_footer(text="Use /gallery to see all your works")
-                
-                await interaction.followup.send(file=file, embed=embed)
-                logger.info(f"Edited image from URL for user {user_id}: {prompt}")
+                logger.info("Edited image from URL for user %s: %s", user_id, prompt)
                 
             except Exception as e:
-                logger.error(f"Image edit from URL failed for user {user_id}: {e}")
+                logger.error("Image edit from URL failed for user %s: %s", user_id, e)
                 embed = discord.Embed(
                     title="Edit Failed",
                     description="Failed to process the image URL. Please check the URL is valid and accessible.",
@@ -472,14 +682,8 @@ class BananaBot(commands.Bot):
                 await interaction.followup.send(embed=embed)
 
         @self.tree.command(name="fuse-images", description="Fuse/combine multiple images into one using AI")
-        @app_commands.describe(
-            prompt="Describe how to combine/fuse multiple images",
-            image1="First image to fuse",
-            image2="Second image to fuse", 
-            image3="Third image (optional)",
-            image4="Fourth image (optional)",
-            image5="Fifth image (optional)"
-        )
+        @self._concurrency_limited
+        @app_commands.describe(**FUSE_IMAGES_DESCRIBE)
         async def fuse_images(
             interaction: discord.Interaction, 
             prompt: str,
@@ -494,43 +698,36 @@ class BananaBot(commands.Bot):
             
             user_id = str(interaction.user.id)
             
+            # Collect all provided images
+            images = [img for img in (image1, image2, image3, image4, image5) if img is not None]
+            
+            # Start the downloads while the rate limit is checked;
+            # the check does not depend on the image bytes
+            download_task = None
+            if all(
+                self._is_valid_attachment(img) and img.size <= config.MAX_IMAGE_SIZE_MB * 1024 * 1024
+                for img in images
+            ):
+                download_task = asyncio.create_task(self._download_attachments(images))
+            
             # Check fusion-specific rate limit (2 per hour)
-            if not await self.fusion_rate_limiter.check_user(user_id):
-                status = await self.fusion_rate_limiter.get_user_status(user_id)
+            allowed, status = await self.fusion_rate_limiter.check_and_status(user_id)
+            if not allowed:
+                if download_task is not None:
+                    download_task.cancel()
                 reset_time = status.get('reset_time')
                 requests_used = status.get('requests_used', 0)
                 
-                embed = discord.Embed(
-                    title="⏰ Rate Limited",
-                    description=f"You've used {requests_used}/{config.MAX_FUSION_REQUESTS_PER_HOUR} fusion requests this hour.",
-                    color=0xE02B2B
+                embed = self._rate_limited_embed(
+                    requests_used, config.MAX_FUSION_REQUESTS_PER_HOUR, reset_time,
+                    tip=FUSION_RATE_LIMIT_TIP, label="fusion requests"
                 )
-                if reset_time:
-                    minutes = int(reset_time / 60)
-                    seconds = int(reset_time % 60)
-                    embed.add_field(
-                        name="Reset Time", 
-                        value=f"⏱️ {minutes}m {seconds}s", 
-                        inline=False
-                    )
-                embed.add_field(
-                    name="💡 Tip",
-                    value="Image fusion uses 1 rate limit slot regardless of image count",
-                    inline=False
-                )
-                
                 await interaction.followup.send(embed=embed)
                 return
             
-            # Collect all provided images
-            images = [image1, image2]
-            if image3: images.append(image3)
-            if image4: images.append(image4) 
-            if image5: images.append(image5)
-            
             # Validate image attachments
             for i, img in enumerate(images):
-                if not img.content_type or not img.content_type.startswith('image/'):
+                if not self._is_valid_attachment(img):
                     embed = discord.Embed(
                         title="❌ Invalid File",
                         description=f"Image {i+1} must be an image file",
@@ -549,12 +746,9 @@ class BananaBot(commands.Bot):
                     return
             
             try:
-                # Download all images
-                image_data_list = []
-                for img in images:
-                    image_data = await img.read()
-                    image_data_list.append(image_data)
-                
+                # Wait for the concurrent downloads (gather preserves order)
+                image_data_list = await download_task
+
                 # Show processing message
                 embed = discord.Embed(
                     title="🔄 Fusing Images...",
@@ -567,7 +761,7 @@ class BananaBot(commands.Bot):
                 result_image_data = await self.gemini_client.fuse_multiple_images(prompt, image_data_list)
                 
                 # Save result and create work record
-                work_id = str(uuid.uuid4())[:8]
+                work_id = secrets.token_hex(4)
                 work = ImageWork(
                     id=work_id,
                     user_id=user_id,
@@ -577,41 +771,36 @@ class BananaBot(commands.Bot):
                     cost=config.STANDARD_IMAGE_COST  # Same cost as regular generation
                 )
                 
-                # Save to user gallery
-                gallery = UserGallery.load(user_id)
-                gallery.add_work(work)
-                
-                # Update user stats
-                stats = UserStats.load(user_id)
-                stats.update_stats(work)
-                
-                # Delete processing message and send result
-                await processing_msg.delete()
+                # Save to user gallery and stats
+                self._record_work(user_id, work)
                 
                 # Create result embed
-                embed = discord.Embed(
-                    title="🎨 Images Fused Successfully!",
-                    description=f"**Prompt:** {prompt}\n**Images combined:** {len(images)}",
-                    color=0x00FF00
-                )
-                embed.add_field(
-                    name="🆔 Work ID", 
-                    value=work_id, 
-                    inline=True
+                embed = self._result_embed(
+                    "🎨 Images Fused Successfully!",
+                    f"**Prompt:** {prompt}\n**Images combined:** {len(images)}",
+                    [
+                        {"name": "🆔 Work ID", "value": work_id, "inline": True},
+                        {"name": "🎨 Images Fused", "value": f"{len(images)} combined", "inline": True},
+                    ],
+                    footer={"text": f"User: {interaction.user.display_name} • BananaBot v1.3.0"}
                 )
-                embed.add_field(
-                    name="🎨 Images Fused", 
-                    value=f"{len(images)} combined", 
-                    inline=True
-                )
-                embed.set_footer(text=f"User: {interaction.user.display_name} • BananaBot v1.3.0")
                 
-                # Send result with fused image
-                file = discord.File(io.BytesIO(result_image_data), filename=f"fused_{work_id}.png")
-                await interaction.followup.send(embed=embed, file=file)
+                # Send result with fused image while deleting the processing message;
+                # the two Discord calls are independent so their round-trips overlap
+                file = await self._image_file(result_image_data, f"fused_{work_id}")
+                deleted, sent = await asyncio.gather(
+                    processing_msg.delete(),
+                    interaction.followup.send(embed=embed, file=file),
+                    return_exceptions=True
+                )
+                if isinstance(sent, BaseException):
+                    raise sent
+                if isinstance(deleted, BaseException):
+                    # The result is already posted; a leftover status message is cosmetic
+                    logger.warning("Failed to delete fusion processing message: %s", deleted)
                 
             except Exception as e:
-                logger.error(f"Image fusion error: {e}")
+                logger.error("Image fusion error: %s", e)
                 embed = discord.Embed(
                     title="❌ Fusion Failed",
                     description=f"Failed to fuse images: {str(e)[:100]}...",
@@ -626,7 +815,7 @@ class BananaBot(commands.Bot):
             user_id = str(interaction.user.id)
             limit = min(max(limit, 1), 10)
             
-            gallery = UserGallery.load(user_id)
+            gallery = await self.gallery_cache.get_gallery(user_id)
             recent_works = gallery.get_recent_works(limit)
             
             if not recent_works:
@@ -638,100 +827,91 @@ class BananaBot(commands.Bot):
                 await interaction.response.send_message(embed=embed)
                 return
             
-            embed = discord.Embed(
-                title=f"🖼️ {interaction.user.display_name}'s Gallery",
-                description=f"Showing your {len(recent_works)} most recent works",
-                color=0x9932CC
-            )
+            # Build every field up front and create the embed in one from_dict call
+            fields = [
+                {
+                    "name": f"{i}. {work.generation_type.title()} - `{work.id}`",
+                    "value": (
+                        f"**Prompt:** {work.prompt[:60]}{'...' if len(work.prompt) > 60 else ''}\n"
+                        f"**Created:** {work.created_at.strftime('%m/%d %H:%M')}"
+                    ),
+                    "inline": False,
+                }
+                for i, work in enumerate(recent_works, 1)
+            ]
+            fields.append({"name": "📊 Stats", "value": f"Total works: {gallery.total_generations}", "inline": False})
             
-            for i, work in enumerate(recent_works, 1):
-                created = work.created_at.strftime('%m/%d %H:%M')
-                prompt_preview = work.prompt[:60] + ('...' if len(work.prompt) > 60 else '')
-                
-                embed.add_field(
-                    name=f"{i}. {work.generation_type.title()} - `{work.id}`",
-                    value=f"**Prompt:** {prompt_preview}\n**Created:** {created}",
-                    inline=False
-                )
-            
-            embed.add_field(
-                name="📊 Stats",
-                value=f"Total works: {gallery.total_generations}",
-                inline=False
-            )
-            embed.set_footer(text="Use /generate to create more images")
+            embed = discord.Embed.from_dict({
+                "title": f"🖼️ {interaction.user.display_name}'s Gallery",
+                "description": f"Showing your {len(recent_works)} most recent works",
+                "color": 0x9932CC,
+                "fields": fields,
+                "footer": {"text": "Use /generate to create more images"},
+            })
             
             await interaction.response.send_message(embed=embed)
 
+        # Help content is static, so build the embed once and reuse it
+        help_embed = discord.Embed(
+            title="🍌 BananaBot v1.3.1",
+            description="AI Image Generation Bot with Multi-Image Fusion",
+            color=0xFFD700
+        )
+        
+        help_embed.add_field(
+            name="🍌 Available Commands",
+            value=(
+                "`/generate <prompt>` - Generate an AI image from text\n"
+                "`/generate-with-image <prompt> <image>` - Edit an attached image\n"
+                "`/generate-link <prompt> <url>` - Edit an image from URL\n"
+                "`/fuse-images <prompt> <img1> <img2> [img3-5]` - Combine multiple images\n"
+                "`/gallery [limit]` - View your image gallery\n"
+                "`/help` - Show this help message"
+            ),
+            inline=False
+        )
+        
+        help_embed.add_field(
+            name="💡 Tips",
+            value=(
+                "• Use `/generate` for creating new images from text\n"
+                "• Use `/generate-with-image` to modify your own images\n"
+                "• Use `/generate-link` to edit images from the web\n"
+                "• Use `/fuse-images` to combine 2-5 images creatively\n"
+                "• All your creations are saved in your gallery"
+            ),
+            inline=False
+        )
+        
+        help_embed.add_field(
+            name="⏰ Rate Limits",
+            value=(
+                f"• Standard commands: {config.MAX_REQUESTS_PER_HOUR} images per hour\n"
+                f"• Fusion commands: {config.MAX_FUSION_REQUESTS_PER_HOUR} fusions per hour\n"
+                "• Limits reset on a rolling hour basis"
+            ),
+            inline=False
+        )
+        
+        help_embed.set_footer(text="BananaBot v1.3.1 • Rate-Limited Multi-Image Fusion")
+
         @self.tree.command(name="help", description="Get help with BananaBot commands")
         async def help_command(interaction: discord.Interaction):
             """Display help information."""
-            embed = discord.Embed(
-                title="🍌 BananaBot v1.3.1",
-                description="AI Image Generation Bot with Multi-Image Fusion",
-                color=0xFFD700
-            )
-            
-            embed.add_field(
-                name="🍌 Available Commands",
-                value=(
-                    "`/generate <prompt>` - Generate an AI image from text\n"
-                    "`/generate-with-image <prompt> <image>` - Edit an attached image\n"
-                    "`/generate-link <prompt> <url>` - Edit an image from URL\n"
-                    "`/fuse-images <prompt> <img1> <img2> [img3-5]` - Combine multiple images\n"
-                    "`/gallery [limit]` - View your image gallery\n"
-                    "`/help` - Show this help message"
-                ),
-                inline=False
-            )
-            
-            embed.add_field(
-                name="💡 Tips",
-                value=(
-                    "• Use `/generate` for creating new images from text\n"
-                    "• Use `/generate-with-image` to modify your own images\n"
-                    "• Use `/generate-link` to edit images from the web\n"
-                    "• Use `/fuse-images` to combine 2-5 images creatively\n"
-                    "• All your creations are saved in your gallery"
-                ),
-                inline=False
-            )
-            
-            embed.add_field(
-                name="⏰ Rate Limits",
-                value=(
-                    f"• Standard commands: {config.MAX_REQUESTS_PER_HOUR} images per hour\n"
-                    f"• Fusion commands: {config.MAX_FUSION_REQUESTS_PER_HOUR} fusions per hour\n"
-                    "• Limits reset on a rolling hour basis"
-                ),
-                inline=False
-            )
-            
-            embed.set_footer(text="BananaBot v1.3.1 • Rate-Limited Multi-Image Fusion")
-            await interaction.response.send_message(embed=embed)
+            await interaction.response.send_message(embed=help_embed)
 
     async def on_ready(self) -> None:
         """Called when the bot is ready."""
-        logger.info(f"Logged in as {self.user} (ID: {self.user.id})")
-        logger.info(f"Discord.py API version: {discord.__version__}")
-        logger.info(f"Python version: {platform.python_version()}")
-        logger.info(f"Running on: {platform.system()} {platform.release()} ({os.name})")
-        logger.info(f"Connected to {len(self.guilds)} guilds")
-        
-        # Sync commands
-        try:
-            synced = await self.tree.sync()
-            logger.info(f"Synced {len(synced)} slash commands")
-        except Exception as e:
-            logger.error(f"Failed to sync commands: {e}")
+        logger.info("Logged in as %s (ID: %s)", self.user, self.user.id)
+        logger.info("Discord.py API version: %s", discord.__version__)
+        logger.info("Python version: %s", platform.python_version())
+        logger.info("Running on: %s %s (%s)", platform.system(), platform.release(), os.name)
+        logger.info("Connected to %d guilds", len(self.guilds))
 
 
 async def main():
     """Main entry point."""
-    # Validate configuration
-    config.validate_config()
-    
-    # Create and run bot
+    # Create and run bot (BananaBot validates configuration on init)
     async with BananaBot() as bot:
         await bot.start(config.DISCORD_TOKEN)
 
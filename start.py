@@ -23,6 +23,14 @@ if __name__ == "__main__":
         # Ensure proper event loop on Windows
         if platform.system() == "Windows":
             asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
+        else:
+            # libuv-based loop for faster websocket/HTTP I/O when available
+            try:
+                import uvloop
+                asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+                print("⚡ Using uvloop event loop")
+            except ImportError:
+                pass
         
         # Run the bot
         asyncio.run(slash_bot.main())
@@ -32,5 +40,5 @@ if __name__ == "__main__":
         sys.exit(0)
     except Exception as e:
         print(f"❌ Failed to start BananaBot: {e}")
-        logging.error(f"Startup error: {e}", exc_info=True)
+        logging.error("Startup error: %s", e, exc_info=True)
         sys.exit(1)
\ No newline at end of file